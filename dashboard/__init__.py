@@ -1,8 +1,9 @@
 """Dashboard integration for RAG Evaluator"""
+import importlib.util
 import subprocess
+import threading
 import webbrowser
 import time
-import sys
 from pathlib import Path
 import logging
 
@@ -10,27 +11,70 @@ logger = logging.getLogger("rag_evaluator.dashboard")
 
 class DashboardLauncher:
     
-    def __init__(self):
-        self.dashboard_dir = Path(__file__).parent.parent.parent.parent / "dashboard"
+    def __init__(self, host: str = "0.0.0.0", port: int = 8000, startup_timeout: float = 10.0):
+        self.dashboard_dir = Path(__file__).parent
+        self.host = host
+        self.port = port
+        self.startup_timeout = startup_timeout
+        self.server = None
+        self.server_thread = None
         self.process = None
     
+    def _load_backend_app(self):
+        spec = importlib.util.spec_from_file_location(
+            "dashboard_backend_app", self.dashboard_dir / "backend" / "app.py"
+        )
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        return module.app
+    
+    def _start_backend(self) -> bool:
+        import uvicorn
+        
+        config = uvicorn.Config(
+            self._load_backend_app(),
+            host=self.host,
+            port=self.port,
+            loop="auto",
+            log_level="warning"
+        )
+        self.server = uvicorn.Server(config)
+        self.server_thread = threading.Thread(target=self.server.run, name="dashboard-backend", daemon=True)
+        self.server_thread.start()
+        
+        deadline = time.monotonic() + self.startup_timeout
+        while not self.server.started:
+            if not self.server_thread.is_alive() or time.monotonic() > deadline:
+                return False
+            time.sleep(0.05)
+        return True
+    
     def launch(self, open_browser: bool = True):
-        runner_path = self.dashboard_dir / "run.py"
+        frontend_dir = self.dashboard_dir / "frontend"
         
-        if not runner_path.exists():
-            raise FileNotFoundError(f"Dashboard runner not found at {runner_path}")
+        if not frontend_dir.exists():
+            raise FileNotFoundError(f"Dashboard frontend not found at {frontend_dir}")
         
         try:
+            if not self._start_backend():
+                logger.error("Dashboard backend failed to start")
+                self.stop()
+                return False
+            
+            logger.info(f"Dashboard backend running on http://localhost:{self.port}")
+            
+            if not (frontend_dir / "node_modules").exists():
+                logger.info("Installing frontend dependencies...")
+                subprocess.run(["npm", "install"], cwd=frontend_dir, check=True)
+            
             self.process = subprocess.Popen(
-                [sys.executable, str(runner_path)],
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                universal_newlines=True
+                ["npm", "run", "dev"],
+                cwd=frontend_dir,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL
             )
             
-            logger.info("Dashboard servers starting...")
-            
-            time.sleep(5)
+            logger.info("Dashboard frontend starting...")
             
             if open_browser:
                 webbrowser.open("http://localhost:5173")
@@ -40,10 +84,19 @@ class DashboardLauncher:
             
         except Exception as e:
             logger.error(f"Failed to launch dashboard: {e}")
+            self.stop()
             return False
     
     def stop(self):
         if self.process:
             self.process.terminate()
             self.process.wait()
-            logger.info("Dashboard servers stopped")
\ No newline at end of file
+            self.process = None
+        
+        if self.server:
+            self.server.should_exit = True
+            self.server_thread.join(timeout=self.startup_timeout)
+            self.server = None
+            self.server_thread = None
+        
+        logger.info("Dashboard servers stopped")
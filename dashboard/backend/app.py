@@ -1,10 +1,26 @@
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import FileResponse, JSONResponse
 from pathlib import Path
-import json
 from datetime import datetime
+import asyncio
+from collections import Counter
+from functools import lru_cache
+import mmap
+import os
+import threading
+from typing import Dict, Optional, Tuple
+import ijson
+import numpy as np
+import orjson
 
-app = FastAPI(title="RAG Evaluator Dashboard API")
+
+class OrjsonResponse(JSONResponse):
+    def render(self, content) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_SERIALIZE_NUMPY)
+
+
+app = FastAPI(title="RAG Evaluator Dashboard API", default_response_class=OrjsonResponse)
 
 app.add_middleware(
     CORSMiddleware,
@@ -16,39 +32,146 @@ app.add_middleware(
 
 RESULTS_DIR = Path(__file__).parent.parent.parent / "evaluation_results"
 QUESTIONS_DIR = Path(__file__).parent.parent.parent / "questions"
+STATS_SUFFIX = ".stats.json"
+
+# Listing records per result file, reused while the file's (mtime_ns, size) is unchanged
+_evaluation_records: Dict[str, Tuple[int, int, dict]] = {}
+
+
+def _load_json(path: Path):
+    with open(path, 'rb') as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            with memoryview(mm) as view:
+                return orjson.loads(view)
+
+
+@lru_cache(maxsize=64)
+def _load_cached(path_str: str, mtime_ns: int, size: int):
+    return _load_json(Path(path_str))
+
+
+def _stat_or_none(path: Path) -> Optional[os.stat_result]:
+    try:
+        return path.stat()
+    except FileNotFoundError:
+        return None
+
+
+def _stat_or_404(path: Path, detail: str) -> os.stat_result:
+    st = _stat_or_none(path)
+    if st is None:
+        raise HTTPException(status_code=404, detail=detail)
+    return st
+
+
+def _stats_path(file_path: Path) -> Path:
+    return file_path.with_name(file_path.stem + STATS_SUFFIX)
+
+
+def _write_stats(stats_path: Path, stats) -> None:
+    # Unique per process and thread, so concurrent uvicorn workers never share a temp file
+    tmp_path = stats_path.with_name(f"{stats_path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        tmp_path.write_bytes(orjson.dumps(stats))
+        tmp_path.replace(stats_path)
+    except OSError:
+        tmp_path.unlink(missing_ok=True)
+
+
+@lru_cache(maxsize=64)
+def _count_question_types(path_str: str, mtime_ns: int, size: int) -> Dict[str, int]:
+    # Stream parse events so only question_type values are decoded, not whole question objects
+    counts = Counter()
+    q_type = "unknown"
+    with open(path_str, 'rb') as f:
+        for prefix, event, value in ijson.parse(f):
+            if prefix == "item":
+                if event == "start_map":
+                    q_type = "unknown"
+                elif event == "end_map":
+                    counts[q_type] += 1
+            elif prefix == "item.question_type":
+                q_type = value
+    return dict(counts)
+
+
+@lru_cache(maxsize=64)
+def _compute_stats_cached(path_str: str, mtime_ns: int, size: int):
+    return _compute_stats(_load_cached(path_str, mtime_ns, size))
+
+
+def _scan_evaluations() -> list:
+    evaluations = []
+    seen = set()
+    with os.scandir(RESULTS_DIR) as entries:
+        for entry in entries:
+            if not entry.name.endswith(".json") or entry.name.endswith(STATS_SUFFIX):
+                continue
+            try:
+                if not entry.is_file():
+                    continue
+                st = entry.stat()
+            except OSError:
+                continue
+            
+            seen.add(entry.name)
+            cached = _evaluation_records.get(entry.name)
+            if cached is not None and cached[:2] == (st.st_mtime_ns, st.st_size):
+                record = cached[2]
+            else:
+                record = {
+                    "id": entry.name[:-len(".json")],
+                    "filename": entry.name,
+                    "timestamp": datetime.fromtimestamp(st.st_mtime).isoformat(),
+                    "size": st.st_size
+                }
+                _evaluation_records[entry.name] = (st.st_mtime_ns, st.st_size, record)
+            evaluations.append(record)
+    
+    for name in _evaluation_records.keys() - seen:
+        _evaluation_records.pop(name, None)
+    
+    return sorted(evaluations, key=lambda x: x["timestamp"], reverse=True)
 
 @app.get("/api/evaluations")
 async def get_evaluations():
-    if not RESULTS_DIR.exists():
+    if _stat_or_none(RESULTS_DIR) is None:
         return []
     
-    evaluations = []
-    for file in RESULTS_DIR.glob("*.json"):
-        try:
-            mtime = datetime.fromtimestamp(file.stat().st_mtime)
-            evaluations.append({
-                "id": file.stem,
-                "filename": file.name,
-                "timestamp": mtime.isoformat(),
-                "size": file.stat().st_size
-            })
-        except Exception as e:
-            continue
-    
-    return sorted(evaluations, key=lambda x: x["timestamp"], reverse=True)
+    # Results are streamed to disk in place, so every entry is re-stat'ed; a file still being
+    # written gets a fresh record once its mtime or size moves
+    return await asyncio.to_thread(_scan_evaluations)
 
 @app.get("/api/evaluations/{evaluation_id}")
 async def get_evaluation_detail(evaluation_id: str):
     file_path = RESULTS_DIR / f"{evaluation_id}.json"
-    if not file_path.exists():
-        raise HTTPException(status_code=404, detail="Evaluation not found")
+    st = _stat_or_404(file_path, "Evaluation not found")
     
-    try:
-        with open(file_path, 'r') as f:
-            data = json.load(f)
-        return data
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    return FileResponse(file_path, media_type="application/json", stat_result=st)
+
+def _scan_question_sets() -> list:
+    question_sets = []
+    with os.scandir(QUESTIONS_DIR) as entries:
+        for entry in entries:
+            if not entry.name.endswith(".json"):
+                continue
+            try:
+                if not entry.is_file():
+                    continue
+                st = entry.stat()
+                question_types = _count_question_types(entry.path, st.st_mtime_ns, st.st_size)
+                
+                question_sets.append({
+                    "id": entry.name[:-len(".json")],
+                    "filename": entry.name,
+                    "total_questions": sum(question_types.values()),
+                    "question_types": question_types,
+                    "timestamp": datetime.fromtimestamp(st.st_mtime).isoformat()
+                })
+            except Exception as e:
+                continue
+    
+    return sorted(question_sets, key=lambda x: x["timestamp"], reverse=True)
 
 @app.get("/api/questions")
 async def get_question_sets():
@@ -56,173 +179,124 @@ async def get_question_sets():
     if not QUESTIONS_DIR.exists():
         return []
     
-    question_sets = []
-    for file in QUESTIONS_DIR.glob("*.json"):
-        try:
-            with open(file, 'r') as f:
-                data = json.load(f)
-            
-            question_types = {}
-            for item in data:
-                q_type = item.get('question_type', 'unknown')
-                question_types[q_type] = question_types.get(q_type, 0) + 1
-            
-            question_sets.append({
-                "id": file.stem,
-                "filename": file.name,
-                "total_questions": len(data),
-                "question_types": question_types,
-                "timestamp": datetime.fromtimestamp(file.stat().st_mtime).isoformat()
-            })
-        except Exception as e:
-            continue
-    
-    return sorted(question_sets, key=lambda x: x["timestamp"], reverse=True)
+    return await asyncio.to_thread(_scan_question_sets)
 
 @app.get("/api/questions/{question_set_id}")
 async def get_questions_detail(question_set_id: str):
     """Get detailed questions from a set"""
     file_path = QUESTIONS_DIR / f"{question_set_id}.json"
-    if not file_path.exists():
-        raise HTTPException(status_code=404, detail="Question set not found")
+    st = _stat_or_404(file_path, "Question set not found")
     
-    try:
-        with open(file_path, 'r') as f:
-            data = json.load(f)
-        return data
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    return FileResponse(file_path, media_type="application/json", stat_result=st)
 
 @app.get("/api/statistics/{evaluation_id}")
 async def get_evaluation_statistics(evaluation_id: str):
     """Calculate statistics for an evaluation"""
     file_path = RESULTS_DIR / f"{evaluation_id}.json"
-    if not file_path.exists():
-        raise HTTPException(status_code=404, detail="Evaluation not found")
+    st = _stat_or_404(file_path, "Evaluation not found")
     
     try:
-        with open(file_path, 'r') as f:
-            data = json.load(f)
-        
-        # Calculate statistics
-        stats = {
-            "overall_score": data.get("overall_score", 0),
-            "goals": [],
-            "metrics_summary": {},
-            "question_types_performance": {},
-            "metric_question_type_performance": {}
-        }
-        
-        metric_scores_by_testcase = {}
-        
-        metric_question_type_scores = {}
-        
-        for goal in data.get("goals", []):
-            goal_stat = {
-                "name": goal["name"],
-                "score": goal["score"],
-                "weight": goal["weight"],
-                "questions_count": len(goal.get("questions", []))
-            }
-            stats["goals"].append(goal_stat)
-            
-            for question in goal.get("questions", []):
-                for metric in question.get("metrics", []):
-                    metric_id = metric["id"]
-                    
-                    if "individual_scores" in metric and metric["individual_scores"]:
-                        if metric_id not in metric_scores_by_testcase:
-                            metric_scores_by_testcase[metric_id] = {}
-                        
-                        for score_detail in metric["individual_scores"]:
-                            test_case_key = f"{score_detail['query']}_{score_detail['question_type']}"
-                            
-                            if test_case_key not in metric_scores_by_testcase[metric_id]:
-                                metric_scores_by_testcase[metric_id][test_case_key] = score_detail["score"]
-                            
-                            q_type = score_detail.get("question_type", "unknown")
-                            if q_type not in stats["question_types_performance"]:
-                                stats["question_types_performance"][q_type] = []
-                            stats["question_types_performance"][q_type].append(score_detail["score"])
-                            
-                            if metric_id not in metric_question_type_scores:
-                                metric_question_type_scores[metric_id] = {}
-                            if q_type not in metric_question_type_scores[metric_id]:
-                                metric_question_type_scores[metric_id][q_type] = []
-                            metric_question_type_scores[metric_id][q_type].append(score_detail["score"])
-        
-        for metric_id, test_case_scores in metric_scores_by_testcase.items():
-            scores = list(test_case_scores.values())
-            
-            if scores:
-                stats["metrics_summary"][metric_id] = {
-                    "average_score": sum(scores) / len(scores),
-                    "min_score": min(scores),
-                    "max_score": max(scores),
-                    "count": len(scores),
-                    "std_dev": calculate_std_dev(scores) if len(scores) > 1 else 0
-                }
-            else:
-                stats["metrics_summary"][metric_id] = {
-                    "average_score": 0,
-                    "min_score": 0,
-                    "max_score": 0,
-                    "count": 0,
-                    "std_dev": 0
-                }
-        
-        if not metric_scores_by_testcase:
-            processed_metrics = set()
-            
-            for goal in data.get("goals", []):
-                for question in goal.get("questions", []):
-                    for metric in question.get("metrics", []):
-                        metric_id = metric["id"]
-                        
-                        if metric_id not in processed_metrics:
-                            processed_metrics.add(metric_id)
-                            
-                            stats["metrics_summary"][metric_id] = {
-                                "average_score": metric["value"],
-                                "min_score": metric["value"],
-                                "max_score": metric["value"],
-                                "count": 1,
-                                "std_dev": 0
-                            }
-        
-        for q_type, scores in stats["question_types_performance"].items():
-            if scores:
-                stats["question_types_performance"][q_type] = {
-                    "average": sum(scores) / len(scores),
-                    "count": len(scores),
-                    "min": min(scores),
-                    "max": max(scores)
-                }
-        
-        for metric_id, question_types in metric_question_type_scores.items():
-            if metric_id not in stats["metric_question_type_performance"]:
-                stats["metric_question_type_performance"][metric_id] = {}
-            
-            for q_type, scores in question_types.items():
-                if scores:
-                    stats["metric_question_type_performance"][metric_id][q_type] = {
-                        "average": sum(scores) / len(scores),
-                        "count": len(scores)
-                    }
+        stats_path = _stats_path(file_path)
+        stats_st = _stat_or_none(stats_path)
+        if stats_st is not None and stats_st.st_mtime_ns >= st.st_mtime_ns:
+            return FileResponse(stats_path, media_type="application/json", stat_result=stats_st)
         
+        stats = await asyncio.to_thread(_compute_stats_cached, str(file_path), st.st_mtime_ns, st.st_size)
+        await asyncio.to_thread(_write_stats, stats_path, stats)
         return stats
-        
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-def calculate_std_dev(scores):
-    if len(scores) < 2:
-        return 0
-    mean = sum(scores) / len(scores)
-    variance = sum((x - mean) ** 2 for x in scores) / (len(scores) - 1)
-    return variance ** 0.5
+def _compute_stats(data):
+    goal_stats = []
+    metric_values = {}
+    metric_scores_by_testcase = {}
+    question_type_scores = {}
+    metric_question_type_scores = {}
+    
+    for goal in data.get("goals", []):
+        questions = goal.get("questions", [])
+        goal_stats.append({
+            "name": goal["name"],
+            "score": goal["score"],
+            "weight": goal["weight"],
+            "questions_count": len(questions)
+        })
+        
+        for question in questions:
+            for metric in question.get("metrics", []):
+                metric_id = metric["id"]
+                if metric_id not in metric_values:
+                    metric_values[metric_id] = metric.get("value", 0)
+                
+                individual_scores = metric.get("individual_scores")
+                if not individual_scores:
+                    continue
+                
+                testcase_scores = metric_scores_by_testcase.setdefault(metric_id, {})
+                type_scores = metric_question_type_scores.setdefault(metric_id, {})
+                
+                for score_detail in individual_scores:
+                    score = score_detail["score"]
+                    q_type = score_detail.get("question_type", "unknown")
+                    
+                    testcase_scores.setdefault((score_detail["query"], score_detail["question_type"]), score)
+                    question_type_scores.setdefault(q_type, []).append(score)
+                    type_scores.setdefault(q_type, []).append(score)
+    
+    metrics_summary = {}
+    metric_question_type_performance = {}
+    
+    if metric_scores_by_testcase:
+        for metric_id, testcase_scores in metric_scores_by_testcase.items():
+            scores = _to_array(testcase_scores.values())
+            metrics_summary[metric_id] = {
+                "average_score": float(scores.mean()),
+                "min_score": float(scores.min()),
+                "max_score": float(scores.max()),
+                "count": int(scores.size),
+                "std_dev": float(scores.std(ddof=1)) if scores.size > 1 else 0
+            }
+            metric_question_type_performance[metric_id] = {
+                q_type: {
+                    "average": float(_to_array(type_scores).mean()),
+                    "count": len(type_scores)
+                }
+                for q_type, type_scores in metric_question_type_scores[metric_id].items()
+            }
+    else:
+        # Without per-test-case details, fall back to the aggregated metric values
+        for metric_id, value in metric_values.items():
+            metrics_summary[metric_id] = {
+                "average_score": value,
+                "min_score": value,
+                "max_score": value,
+                "count": 1,
+                "std_dev": 0
+            }
+    
+    question_types_performance = {}
+    for q_type, scores in question_type_scores.items():
+        scores = _to_array(scores)
+        question_types_performance[q_type] = {
+            "average": float(scores.mean()),
+            "count": int(scores.size),
+            "min": float(scores.min()),
+            "max": float(scores.max())
+        }
+    
+    return {
+        "overall_score": data.get("overall_score", 0),
+        "goals": goal_stats,
+        "metrics_summary": metrics_summary,
+        "question_types_performance": question_types_performance,
+        "metric_question_type_performance": metric_question_type_performance
+    }
+
+def _to_array(scores) -> np.ndarray:
+    return np.fromiter(scores, dtype=np.float64, count=len(scores))
 
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000, reload=True)
\ No newline at end of file
+    uvicorn.run("app:app", host="0.0.0.0", port=8000, workers=int(os.getenv("DASHBOARD_WORKERS", "4")))
\ No newline at end of file
@@ -1,4 +1,6 @@
 #!/usr/bin/env python3
+import importlib.util
+import os
 import subprocess
 import sys
 import time
@@ -40,8 +42,13 @@ def start_backend():
     backend_dir = Path(__file__).parent / "backend"
     print("Starting backend server on http://localhost:8000...")
     
+    workers = os.getenv("DASHBOARD_WORKERS", "4")
+    loop = "uvloop" if importlib.util.find_spec("uvloop") else "asyncio"
+    http = "httptools" if importlib.util.find_spec("httptools") else "h11"
+    
     process = subprocess.Popen(
-        [sys.executable, "-m", "uvicorn", "app:app", "--reload", "--host", "0.0.0.0", "--port", "8000"],
+        [sys.executable, "-m", "uvicorn", "app:app", "--workers", workers, "--loop", loop, "--http", http,
+         "--host", "0.0.0.0", "--port", "8000"],
         cwd=backend_dir
     )
     processes.append(process)
@@ -154,6 +154,7 @@ def main():
     eval_time = time.time() - start_time
     
     eval_pipeline.save_results(results, "evaluation_results")
+    eval_pipeline.close()
     
     print(f"\nEvaluation completed in {eval_time:.2f} seconds")
     print(f"Overall Score: {results.score:.4f}")
@@ -1,4 +1,4 @@
 from .gemini_client import GeminiClient
-from .voyage_client import get_voyage_client, embed_texts
+from .voyage_client import get_voyage_client, embed_texts, quantize_int8
 
-__all__ = ["GeminiClient", "get_voyage_client", "embed_texts"]
\ No newline at end of file
+__all__ = ["GeminiClient", "get_voyage_client", "embed_texts", "quantize_int8"]
\ No newline at end of file
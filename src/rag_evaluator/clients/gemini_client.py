@@ -1,14 +1,58 @@
+import hashlib
+import json
 import logging
-from typing import Optional, Dict
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Optional, Dict, List, Union
 
 from rag_evaluator.config import get_config
 
 
+class _RateLimiter:
+    """Spaces request starts so at most `requests_per_minute` begin per minute."""
+    
+    def __init__(self, requests_per_minute: int):
+        self.interval = 60.0 / requests_per_minute if requests_per_minute > 0 else 0.0
+        self._lock = threading.Lock()
+        self._next_slot = 0.0
+    
+    def acquire(self) -> None:
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            wait = self._next_slot - now
+            self._next_slot = max(now, self._next_slot) + self.interval
+        if wait > 0:
+            time.sleep(wait)
+
+
+# Responses kept in memory, so repeated prompts in one process skip the disk and, for the
+# metric prompts, the API even when the disk cache is off
+_MEMORY_CACHE_SIZE = 4096
+
+
 class GeminiClient:
     
     def __init__(self):
         self.logger = logging.getLogger("rag_evaluator.gemini_client")
-        self.config = get_config().get_gemini_config()
+        app_config = get_config()
+        self.config = app_config.get_gemini_config()
+        self.max_concurrency = app_config.gemini_max_concurrency
+        # Caps in-flight requests across every batch and thread, not just within one generate_batch call
+        self._request_slots = threading.BoundedSemaphore(max(self.max_concurrency, 1))
+        self._rate_limiter = _RateLimiter(app_config.gemini_requests_per_minute)
+        self.metric_request_timeout = app_config.gemini_request_timeout or None
+        # Claim prompts cover many answers or full contexts with long JSON output, so they get their own cap
+        self.claim_request_timeout = app_config.gemini_claim_request_timeout or None
+        self.request_retries = app_config.gemini_request_retries
+        self.cache_dir = Path(app_config.gemini_cache_dir) if app_config.gemini_cache_enabled else None
+        self._memory_cache: "OrderedDict[str, str]" = OrderedDict()
+        self._memory_cache_lock = threading.Lock()
 
         self._init_gemini()
         self._setup_generation_configs()
@@ -17,6 +61,9 @@ class GeminiClient:
     def _init_gemini(self):
         try:
             import google.generativeai as genai
+            from google.api_core import exceptions as google_exceptions
+            
+            self._timeout_errors = (google_exceptions.DeadlineExceeded, TimeoutError)
             
             genai.configure(api_key=self.config['api_key'])
             
@@ -40,53 +87,180 @@ class GeminiClient:
             "max_output_tokens": 20000,
         }
         
+        self.question_generation_config = {
+            **self.default_generation_config,
+            "response_mime_type": "application/json",
+        }
+        
         self.metric_mapping_config = {
             "temperature": 0.1,
             "top_p": 0.8,
             "top_k": 40,
             "max_output_tokens": 20000,
         }
+        
+        self.claim_extraction_config = {
+            **self.metric_mapping_config,
+            "response_mime_type": "application/json",
+        }
+    
+    def _cache_key(self, prompt: str, config: Dict) -> str:
+        key_source = json.dumps([self.config['model'], config, prompt], sort_keys=True)
+        return hashlib.sha256(key_source.encode()).hexdigest()
+    
+    def _write_cached_response(self, cache_path: Path, text: str) -> None:
+        tmp_path = cache_path.with_name(f"{cache_path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path.write_text(text, encoding='utf-8')
+            tmp_path.replace(cache_path)
+        except OSError as e:
+            tmp_path.unlink(missing_ok=True)
+            self.logger.warning(f"Failed to cache Gemini response: {e}")
+    
+    def _remember_response(self, key: str, text: str) -> None:
+        with self._memory_cache_lock:
+            self._memory_cache[key] = text
+            self._memory_cache.move_to_end(key)
+            if len(self._memory_cache) > _MEMORY_CACHE_SIZE:
+                self._memory_cache.popitem(last=False)
+    
+    def _generate_content(self, prompt: str, config: Dict, timeout: Optional[float]):
+        request_options = {"timeout": timeout} if timeout else None
+        for attempt in range(self.request_retries + 1):
+            try:
+                with self._request_slots:
+                    self._rate_limiter.acquire()
+                    return self.model.generate_content(
+                        prompt,
+                        generation_config=config,
+                        request_options=request_options
+                    )
+            except self._timeout_errors:
+                if attempt == self.request_retries:
+                    raise
+                self.logger.warning(
+                    f"Gemini request timed out after {timeout}s, retrying ({attempt + 1}/{self.request_retries})"
+                )
+                time.sleep(2 ** attempt)
     
-    def generate(self, prompt: str, generation_config: Optional[Dict] = None) -> str:
-        self.logger.debug(f"Generating content with prompt: {prompt}")
+    def generate(
+        self,
+        prompt: str,
+        generation_config: Optional[Dict] = None,
+        use_cache: bool = True,
+        timeout: Optional[float] = None,
+        memoize: bool = False
+    ) -> str:
+        self.logger.debug("Generating content with prompt: %s", prompt)
         config = generation_config or self.default_generation_config
         
+        cache_key = self._cache_key(prompt, config) if use_cache and (self.cache_dir or memoize) else None
+        cache_path = self.cache_dir / f"{cache_key}.txt" if cache_key and self.cache_dir else None
+        if cache_key is not None:
+            with self._memory_cache_lock:
+                if cache_key in self._memory_cache:
+                    self._memory_cache.move_to_end(cache_key)
+                    return self._memory_cache[cache_key]
+        if cache_path is not None:
+            try:
+                text = cache_path.read_text(encoding='utf-8')
+                self._remember_response(cache_key, text)
+                return text
+            except FileNotFoundError:
+                pass
+        
         try:
-            response = self.model.generate_content(
-                prompt,
-                generation_config=config
-            )
+            response = self._generate_content(prompt, config, timeout)
 
-            self.logger.debug(f"Gemini response: {response}")
+            self.logger.debug("Gemini response: %s", response)
             
-            return response.text.strip()
+            text = response.text.strip()
             
         except Exception as e:
             self.logger.error(f"Gemini API error: {str(e)}")
             raise RuntimeError(f"Gemini API error: {str(e)}")
+        
+        if cache_path is not None:
+            self._write_cached_response(cache_path, text)
+        if cache_key is not None:
+            self._remember_response(cache_key, text)
+        return text
+    
+    def generate_batch(
+        self,
+        prompts: List[str],
+        generation_config: Optional[Dict] = None,
+        return_exceptions: bool = False,
+        use_cache: bool = True,
+        timeout: Optional[float] = None,
+        memoize: bool = False
+    ) -> List[Union[str, Exception]]:
+        """Generate responses for several prompts concurrently, preserving input order."""
+        if not prompts:
+            return []
+        
+        def _generate(prompt: str) -> Union[str, Exception]:
+            try:
+                return self.generate(prompt, generation_config, use_cache, timeout, memoize)
+            except Exception as e:
+                if return_exceptions:
+                    return e
+                raise
+        
+        # Identical prompts in one batch would all miss the cache together, so each is sent once
+        unique_prompts = prompts if not (use_cache and memoize) else list(dict.fromkeys(prompts))
+        
+        workers = min(self.max_concurrency, len(unique_prompts))
+        if workers <= 1:
+            responses = [_generate(prompt) for prompt in unique_prompts]
+        else:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                responses = list(executor.map(_generate, unique_prompts))
+        
+        if unique_prompts is prompts:
+            return responses
+        by_prompt = dict(zip(unique_prompts, responses))
+        return [by_prompt[prompt] for prompt in prompts]
     
     def generate_for_questions(self, prompt: str) -> str:
-        return self.generate(prompt)
+        return self.generate(prompt, self.question_generation_config)
+    
+    def generate_batch_for_questions(self, prompts: List[str]) -> List[Union[str, Exception]]:
+        return self.generate_batch(prompts, self.question_generation_config, return_exceptions=True)
     
     def generate_for_metrics(self, prompt: str) -> str:
-        return self.generate(prompt, self.metric_mapping_config)
+        return self.generate(
+            prompt, self.metric_mapping_config, timeout=self.metric_request_timeout, memoize=True
+        )
+    
+    def generate_batch_for_metrics(self, prompts: List[str]) -> List[Union[str, Exception]]:
+        return self.generate_batch(
+            prompts, self.metric_mapping_config, return_exceptions=True,
+            timeout=self.metric_request_timeout, memoize=True
+        )
+    
+    def generate_batch_for_claims(self, prompts: List[str]) -> List[Union[str, Exception]]:
+        return self.generate_batch(
+            prompts, self.claim_extraction_config, return_exceptions=True,
+            timeout=self.claim_request_timeout, memoize=True
+        )
 
 
 _gemini_client_instance = None
+_gemini_client_lock = threading.Lock()
 
 
 def create_gemini_client() -> GeminiClient:
+    """Return the process-wide client, creating it on first use; repeated calls reuse it."""
     global _gemini_client_instance
-    if _gemini_client_instance is not None:
-        raise RuntimeError("Gemini client instance already exists")
-    
-    _gemini_client_instance = GeminiClient()
+    if _gemini_client_instance is None:
+        with _gemini_client_lock:
+            if _gemini_client_instance is None:
+                _gemini_client_instance = GeminiClient()
     
     return _gemini_client_instance
 
 
-def get_gemini_client() -> Optional[GeminiClient]:
-    global _gemini_client_instance
-    if _gemini_client_instance is None:
-        create_gemini_client()
-    return _gemini_client_instance
\ No newline at end of file
+def get_gemini_client() -> GeminiClient:
+    return create_gemini_client()
@@ -1,5 +1,9 @@
+import hashlib
 import logging
-from typing import List, Optional
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import List, Optional, Tuple
 import numpy as np
 import voyageai
 
@@ -7,31 +11,91 @@ from rag_evaluator.config import get_config
 
 _voyage_client = None
 
+# Embeddings of texts seen earlier in the process, keyed by (model, sha256 of the text), least recently used evicted first
+_embedding_cache: "OrderedDict[Tuple[str, str], np.ndarray]" = OrderedDict()
+_embedding_cache_lock = threading.Lock()
+
 def get_voyage_client():
     global _voyage_client
     if _voyage_client is None:
         config = get_config()
-        _voyage_client = voyageai.Client(api_key=config.voyage_api_key)
+        _voyage_client = voyageai.Client(
+            api_key=config.voyage_api_key,
+            max_retries=config.voyage_max_retries
+        )
         logging.getLogger("rag_evaluator.embeddings").info(
             f"Initialized Voyage AI client with model: {config.voyage_model}"
         )
     return _voyage_client
 
-def embed_texts(texts: List[str], batch_size: int = 128) -> np.ndarray:
+def _embed_batch(client, batch: List[str], model: str, index: int, dtype=np.float32) -> np.ndarray:
+    try:
+        response = client.embed(batch, model=model)
+        return np.asarray(response.embeddings, dtype=dtype)
+    except Exception as e:
+        logging.getLogger("rag_evaluator.embeddings").error(
+            f"Failed to embed batch {index}: {e}"
+        )
+        raise
+
+def embed_texts(texts: List[str], batch_size: int = 128, dtype=np.float32) -> np.ndarray:
+    """Embed texts into a (len(texts), dim) array of the given dtype (float32 or float16)."""
+    config = get_config()
+    if not config.voyage_cache_size or not texts:
+        return _embed_uncached(texts, batch_size, dtype)
+    
+    keys = [(config.voyage_model, hashlib.sha256(text.encode()).hexdigest()) for text in texts]
+    with _embedding_cache_lock:
+        found = {}
+        for key in keys:
+            if key in _embedding_cache:
+                _embedding_cache.move_to_end(key)
+                found[key] = _embedding_cache[key]
+    
+    missing = {key: text for key, text in zip(keys, texts) if key not in found}
+    if missing:
+        fresh = _embed_uncached(list(missing.values()), batch_size, np.float32)
+        with _embedding_cache_lock:
+            for key, row in zip(missing, fresh):
+                found[key] = _embedding_cache[key] = row
+                _embedding_cache.move_to_end(key)
+            while len(_embedding_cache) > config.voyage_cache_size:
+                _embedding_cache.popitem(last=False)
+    
+    return np.stack([found[key] for key in keys]).astype(dtype, copy=False)
+
+def _embed_uncached(texts: List[str], batch_size: int, dtype) -> np.ndarray:
     client = get_voyage_client()
     config = get_config()
     
-    all_embeddings = []
+    batches = [texts[i:i + batch_size] for i in range(0, len(texts), batch_size)]
+    if not batches:
+        return np.empty((0, 0), dtype=dtype)
     
-    for i in range(0, len(texts), batch_size):
-        batch = texts[i:i + batch_size]
-        try:
-            response = client.embed(batch, model=config.voyage_model)
-            all_embeddings.extend(response.embeddings)
-        except Exception as e:
-            logging.getLogger("rag_evaluator.embeddings").error(
-                f"Failed to embed batch {i//batch_size}: {e}"
-            )
-            raise
+    if len(batches) == 1:
+        return _embed_batch(client, batches[0], config.voyage_model, 0, dtype)
     
-    return np.array(all_embeddings)
\ No newline at end of file
+    # Copy each batch into one preallocated buffer as it arrives instead of concatenating at the end
+    out = None
+    workers = min(config.voyage_max_workers, len(batches))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            executor.submit(_embed_batch, client, batch, config.voyage_model, index, dtype): index * batch_size
+            for index, batch in enumerate(batches)
+        }
+        for future in as_completed(futures):
+            part = future.result()
+            if out is None:
+                out = np.empty((len(texts), part.shape[1]), dtype=dtype)
+            start = futures[future]
+            out[start:start + len(part)] = part
+    
+    return out
+
+def quantize_int8(embeddings: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Quantize embeddings to int8 with a per-row scale; dequantize as q * scale."""
+    embeddings = np.asarray(embeddings, dtype=np.float32)
+    scale = np.max(np.abs(embeddings), axis=1, keepdims=True) / 127.0
+    scale[scale == 0] = 1.0
+    quantized = np.round(embeddings / scale).astype(np.int8)
+    return quantized, scale
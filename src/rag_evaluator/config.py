@@ -22,6 +22,12 @@ class GoalConfig(BaseModel):
 class EvaluationConfig(BaseModel):
     goals: List[GoalConfig]
     test_case_generation: Dict[str, Any] = Field(default_factory=dict)
+    max_workers: int = Field(default=8, ge=1)
+    metric_workers: int = Field(default=16, ge=1)
+    cache_dir: Optional[str] = None
+    metric_cache_size: int = Field(default=256, ge=1)
+    keep_rag_loaded: bool = False
+    warm_up_query: Optional[str] = None
     
     @classmethod
     def from_yaml(cls, yaml_path: str) -> "EvaluationConfig":
@@ -37,7 +43,17 @@ class Config:
     gemini_api_key: Optional[str] = None
     voyage_api_key: Optional[str] = None
     voyage_model: str = 'voyage-3-large'
+    voyage_max_workers: int = 8
+    voyage_max_retries: int = 3
+    voyage_cache_size: int = 10000
     gemini_model: str = 'gemini-2.5-flash'
+    gemini_max_concurrency: int = 8
+    gemini_requests_per_minute: int = 0
+    gemini_request_timeout: float = 15.0
+    gemini_claim_request_timeout: float = 0.0
+    gemini_request_retries: int = 2
+    gemini_cache_enabled: bool = False
+    gemini_cache_dir: str = '.cache/gemini'
     bertscore_model: str = 'microsoft/deberta-v3-large'
     question_cache_dir: str = 'questions'
     output_dir: str = 'evaluation_results'
@@ -45,6 +61,9 @@ class Config:
     return_detailed_results: bool = False
     use_metric_mapper: bool = False
     tokenizers_parallelism: bool = False
+    hhem_compile: bool = False
+    hhem_cpu_int8: bool = True
+    context_utilization_max_chars: int = 1500
     
     def validate(self) -> None:
         errors = []
@@ -106,14 +125,27 @@ class ConfigLoader:
             gemini_api_key=os.getenv('GEMINI_API_KEY'),
             voyage_api_key=os.getenv('VOYAGE_API_KEY'),
             voyage_model=os.getenv('VOYAGE_MODEL', 'voyage-3-large'),
+            voyage_max_workers=int(os.getenv('VOYAGE_MAX_WORKERS', '8')),
+            voyage_max_retries=int(os.getenv('VOYAGE_MAX_RETRIES', '3')),
+            voyage_cache_size=int(os.getenv('VOYAGE_CACHE_SIZE', '10000')),
             gemini_model=os.getenv('GEMINI_MODEL', 'gemini-2.5-flash'),
+            gemini_max_concurrency=int(os.getenv('GEMINI_MAX_CONCURRENCY', '8')),
+            gemini_requests_per_minute=int(os.getenv('GEMINI_REQUESTS_PER_MINUTE', '0')),
+            gemini_request_timeout=float(os.getenv('GEMINI_REQUEST_TIMEOUT', '15')),
+            gemini_claim_request_timeout=float(os.getenv('GEMINI_CLAIM_REQUEST_TIMEOUT', '0')),
+            gemini_request_retries=int(os.getenv('GEMINI_REQUEST_RETRIES', '2')),
+            gemini_cache_enabled=self._get_bool_env('GEMINI_CACHE_ENABLED', False),
+            gemini_cache_dir=os.getenv('GEMINI_CACHE_DIR', '.cache/gemini'),
             bertscore_model=os.getenv('BERTSCORE_MODEL', 'roberta-large'),
             question_cache_dir=os.getenv('QUESTION_CACHE_DIR', 'questions'),
             output_dir=os.getenv('OUTPUT_DIR', 'evaluation_results'),
             pinecone_index_name=os.getenv('PINECONE_INDEX_NAME'),
             return_detailed_results=self._get_bool_env('RETURN_DETAILED_RESULTS'),
             use_metric_mapper=self._get_bool_env('USE_METRIC_MAPPER'),
-            tokenizers_parallelism=self._get_bool_env('TOKENIZERS_PARALLELISM', False)
+            tokenizers_parallelism=self._get_bool_env('TOKENIZERS_PARALLELISM', False),
+            hhem_compile=self._get_bool_env('HHEM_COMPILE', False),
+            hhem_cpu_int8=self._get_bool_env('HHEM_CPU_INT8', True),
+            context_utilization_max_chars=int(os.getenv('CONTEXT_UTILIZATION_MAX_CHARS', '1500'))
         )
 
         config.validate()
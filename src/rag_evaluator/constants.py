@@ -30,6 +30,17 @@ class MetricId(Enum):
     CONTEXT_UTILIZATION = "context_utilization"
 
 
+METRIC_ID_VALUES = frozenset(metric_id.value for metric_id in MetricId)
+
+# Metrics backed by local models (HHEM, BERTScore, spaCy); these share one device and run one at a time
+LOCAL_MODEL_METRICS = frozenset({
+    MetricId.FAITHFULNESS,
+    MetricId.FACTUAL_CONSISTENCY,
+    MetricId.BERTSCORE,
+    MetricId.CONTEXT_ENTITIES_RECALL,
+})
+
+
 @dataclass
 class MetricInfo:
     name: str
@@ -1,35 +1,71 @@
 from typing import List, Any
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 
 from rag_evaluator.constants import QuestionType
 
 
-@dataclass
+@dataclass(slots=True)
 class TestCase:
     question: str
     ground_truth: str
     question_type: str = QuestionType.SIMPLE
-    entities: List[str] = None
-    
-    def __post_init__(self):
-        if self.entities is None:
-            self.entities = []
+    entities: List[str] = field(default_factory=list)
 
 
-@dataclass
+@dataclass(slots=True)
 class TestCaseResult:
     query: str
     generated_answer: str
     retrieved_documents: List[Any]
     ground_truth: str
-    entities: List[str] = None
+    entities: List[str] = field(default_factory=list)
     question_type: str = QuestionType.SIMPLE
     
-    def __post_init__(self):
-        if self.entities is None:
-            self.entities = []
-    
 
-@dataclass
+@dataclass(slots=True)
 class EvaluationData:
-    test_case_results: List[TestCaseResult]
\ No newline at end of file
+    test_case_results: List[TestCaseResult]
+
+
+def document_text(doc: Any) -> str:
+    text = doc.get_content() if hasattr(doc, "get_content") else str(doc)
+    return text if text is not None else ""
+
+
+@dataclass(slots=True)
+class BatchedEvaluationData(EvaluationData):
+    """EvaluationData plus per-field columns, built once and shared by every metric."""
+    queries: List[str] = field(default_factory=list)
+    answers: List[str] = field(default_factory=list)
+    ground_truths: List[str] = field(default_factory=list)
+    contexts: List[List[str]] = field(default_factory=list)
+    combined_contexts: List[str] = field(default_factory=list)
+    
+    @classmethod
+    def from_evaluation_data(cls, evaluation_data: EvaluationData) -> "BatchedEvaluationData":
+        if isinstance(evaluation_data, cls):
+            return evaluation_data
+        
+        results = evaluation_data.test_case_results
+        contexts = [
+            [document_text(doc) for doc in result.retrieved_documents or []]
+            for result in results
+        ]
+        
+        # Test cases often retrieve the same documents, so each distinct set is joined only once
+        joined = {}
+        combined_contexts = []
+        for texts in contexts:
+            key = tuple(texts)
+            if key not in joined:
+                joined[key] = "\n\n".join(texts)
+            combined_contexts.append(joined[key])
+        
+        return cls(
+            test_case_results=results,
+            queries=[result.query for result in results],
+            answers=[result.generated_answer for result in results],
+            ground_truths=[result.ground_truth for result in results],
+            contexts=contexts,
+            combined_contexts=combined_contexts
+        )
\ No newline at end of file
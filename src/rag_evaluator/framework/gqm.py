@@ -1,21 +1,72 @@
 import gc
-import time
-from typing import Dict, List, Any, Optional
-from dataclasses import dataclass
+import hashlib
+import pickle
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Any, Optional, Tuple
+from dataclasses import dataclass, field
+from enum import Enum
+from operator import attrgetter
+from pathlib import Path
 import logging
 import json
 import numpy as np
+import orjson
 import torch
 
 from rag_evaluator.adapters.langchain import LangChainRAGAdapter
 
 from ..config import get_config, GoalConfig, QuestionConfig, EvaluationConfig
+from ..constants import LOCAL_MODEL_METRICS, MetricId
 from .llm_metric_mapper import LLMMetricMapper
 from .metric_executor import MetricExecutor
-from .evaluation_data import EvaluationData, TestCase, TestCaseResult
+from .evaluation_data import EvaluationData, TestCase, TestCaseResult, document_text
 
 
-@dataclass
+# Below this many items, building NumPy arrays costs more than the plain Python sums
+_VECTORIZE_MIN_ITEMS = 4
+
+
+def _weighted_mean(items: List[Any], value_attr: str) -> float:
+    if not items:
+        return 0.0
+    
+    get_value = attrgetter(value_attr)
+    if len(items) < _VECTORIZE_MIN_ITEMS:
+        total_weight = sum(item.weight for item in items)
+        weighted_sum = sum(get_value(item) * item.weight for item in items)
+    else:
+        values = np.fromiter(map(get_value, items), dtype=np.float64, count=len(items))
+        weights = np.fromiter((item.weight for item in items), dtype=np.float64, count=len(items))
+        total_weight = float(weights.sum())
+        weighted_sum = float(values @ weights)
+    
+    return weighted_sum / total_weight if total_weight > 0 else 0.0
+
+
+def _to_float(value: Any) -> float:
+    return float(value.item()) if hasattr(value, "item") else float(value)
+
+
+def _pythonize(obj: Any) -> Any:
+    # Convert numpy/torch values once when a metric result is cached, so serialization sees plain Python types
+    if isinstance(obj, (str, int, float, bool)) or obj is None:
+        return obj
+    if isinstance(obj, dict):
+        return {key: _pythonize(value) for key, value in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_pythonize(item) for item in obj]
+    if isinstance(obj, Enum):
+        return obj.value
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    if hasattr(obj, "item"):
+        return obj.item()
+    return obj
+
+
+@dataclass(slots=True)
 class MetricResult:
     metric_id: str
     value: float
@@ -27,90 +78,82 @@ class MetricResult:
     def has_details(self) -> bool:
         return self.individual_scores is not None
 
-@dataclass
+@dataclass(slots=True)
 class QuestionResult:
     question_text: str
     metrics: List[MetricResult]
     weight: float = 1.0
+    score: float = field(init=False)
     
-    @property
-    def score(self) -> float:
-        if not self.metrics:
-            return 0.0
-        
-        total_weight = sum(metric.weight for metric in self.metrics)
-        weighted_sum = sum(metric.value * metric.weight for metric in self.metrics)
-        return weighted_sum / total_weight
+    def __post_init__(self):
+        self.score = _weighted_mean(self.metrics, "value")
 
 
-@dataclass
+@dataclass(slots=True)
 class GoalResult:
     goal_name: str
     questions: List[QuestionResult]
     weight: float = 1.0
+    score: float = field(init=False)
     
-    @property
-    def score(self) -> float:
-        if not self.questions:
-            return 0.0
-        
-        total_weight = sum(question.weight for question in self.questions)
-        weighted_sum = sum(question.score * question.weight for question in self.questions)
-        
-        return weighted_sum / total_weight if total_weight > 0 else 0.0
+    def __post_init__(self):
+        self.score = _weighted_mean(self.questions, "score")
 
 
-@dataclass
+@dataclass(slots=True)
 class EvaluationResult:
     goals: List[GoalResult]
+    score: float = field(init=False)
     
-    @property
-    def score(self) -> float:
-        if not self.goals:
-            return 0.0
-        
-        total_weight = sum(goal.weight for goal in self.goals)
-        weighted_sum = sum(goal.score * goal.weight for goal in self.goals)
-        
-        return weighted_sum / total_weight if total_weight > 0 else 0.0
+    def __post_init__(self):
+        self.score = _weighted_mean(self.goals, "score")
     
-    def to_dict(self) -> Dict[str, Any]:
+    @staticmethod
+    def _goal_to_dict(goal: GoalResult) -> Dict[str, Any]:
         return {
-            "overall_score": self.score,
-            "goals": [
+            "name": goal.goal_name,
+            "score": goal.score,
+            "weight": goal.weight,
+            "questions": [
                 {
-                    "name": goal.goal_name,
-                    "score": goal.score,
-                    "weight": goal.weight,
-                    "questions": [
+                    "text": question.question_text,
+                    "score": question.score,
+                    "weight": question.weight,
+                    "metrics": [
                         {
-                            "text": question.question_text,
-                            "score": question.score,
-                            "weight": question.weight,
-                            "metrics": [
-                                {
-                                    "id": metric.metric_id,
-                                    "value": metric.value,
-                                    "weight": metric.weight,
-                                    **({"individual_scores": metric.individual_scores} 
-                                        if metric.has_details else {})
-                                }
-                                for metric in question.metrics
-                            ]
+                            "id": metric.metric_id,
+                            "value": metric.value,
+                            "weight": metric.weight,
+                            **({"individual_scores": metric.individual_scores} 
+                                if metric.has_details else {})
                         }
-                        for question in goal.questions
+                        for metric in question.metrics
                     ]
                 }
-                for goal in self.goals
+                for question in goal.questions
             ]
         }
     
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "overall_score": self.score,
+            "goals": [self._goal_to_dict(goal) for goal in self.goals]
+        }
+    
     def save(self, filepath: str) -> None:
-        with open(filepath, 'w') as f:
-            json.dump(self.to_dict(), f, indent=2, cls=NumpyEncoder)
+        # Serialize one goal at a time so the full nested dict is never held in memory
+        options = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+        
+        with open(filepath, 'wb') as f:
+            f.write(b'{"overall_score":' + orjson.dumps(self.score, option=options) + b',"goals":[')
+            for i, goal in enumerate(self.goals):
+                if i:
+                    f.write(b',')
+                f.write(b'\n' + orjson.dumps(self._goal_to_dict(goal), option=options))
+            f.write(b'\n]}\n')
 
 
-@dataclass
+@dataclass(slots=True)
 class CachedMetricResult:
     metric_id: str
     value: float
@@ -124,7 +167,13 @@ class GQMFramework:
         # self.metric_mapper = LLMMetricMapper()
         self.metric_executor = MetricExecutor()
 
-        self._metric_cache: Dict[str, CachedMetricResult] = {}
+        self._metric_cache: OrderedDict[Tuple[str, Optional[str]], CachedMetricResult] = OrderedDict()
+        self._metric_cache_lock = threading.Lock()
+        self._metric_cache_size = config.metric_cache_size
+        self._cache_dir = Path(config.cache_dir).expanduser() if config.cache_dir else None
+        self._data_fingerprint: Optional[str] = None
+        self._query_pool: Optional[ThreadPoolExecutor] = None
+        self._rag_system: Any = None
         
         # Not needed - managed manually by providing metrics in config
         # if self._needs_metric_mapping():
@@ -142,42 +191,126 @@ class GQMFramework:
                     return True
         return False
     
+    def _query_rag_system(self, question: str, rag_system: LangChainRAGAdapter) -> Tuple[str, List[Any]]:
+        try:
+            rag_result = rag_system.query(question)
+            return rag_result.answer, rag_result.retrieved_documents
+        except Exception as e:
+            self.logger.error(f"Failed to process test case '{question}': {e}")
+            return "", []
+    
+    def warm_up(self, rag_system: LangChainRAGAdapter) -> None:
+        if not self.config.warm_up_query:
+            return
+        self.logger.info("Warming up RAG system")
+        self._query_rag_system(self.config.warm_up_query, rag_system)
+    
     def _test_rag_system(self, test_cases: List[TestCase], rag_system: LangChainRAGAdapter) -> EvaluationData:
-        self.logger.info(f"Running {len(test_cases)} test cases through RAG system")
+        unique_questions = list(dict.fromkeys(test_case.question for test_case in test_cases))
+        self.logger.info(
+            f"Running {len(test_cases)} test cases through RAG system "
+            f"({len(unique_questions)} unique questions)"
+        )
         
-        test_case_results = []
+        if self._query_pool is None:
+            self._query_pool = ThreadPoolExecutor(max_workers=self.config.max_workers, thread_name_prefix="rag-query")
+        
+        rag_outputs = dict(zip(unique_questions, self._query_pool.map(
+            lambda question: self._query_rag_system(question, rag_system),
+            unique_questions
+        )))
         
+        test_case_results = []
         for test_case in test_cases:
-            try:
-                rag_result = rag_system.query(test_case.question)
-                
-                test_case_results.append(TestCaseResult(
-                    query=test_case.question,
-                    generated_answer=rag_result.answer,
-                    retrieved_documents=rag_result.retrieved_documents,
-                    ground_truth=test_case.ground_truth,
-                    entities=test_case.entities,
-                    question_type=test_case.question_type
-                ))
-                
-            except Exception as e:
-                self.logger.error(f"Failed to process test case '{test_case.question}': {e}")
-                test_case_results.append(TestCaseResult(
-                    query=test_case.question,
-                    generated_answer="",
-                    retrieved_documents=[],
-                    ground_truth=test_case.ground_truth,
-                    entities=test_case.entities,
-                    question_type=test_case.question_type
-                ))
+            answer, retrieved_documents = rag_outputs[test_case.question]
+            test_case_results.append(TestCaseResult(
+                query=test_case.question,
+                generated_answer=answer,
+                retrieved_documents=list(retrieved_documents),
+                ground_truth=test_case.ground_truth,
+                entities=test_case.entities,
+                question_type=test_case.question_type
+            ))
         
         return EvaluationData(test_case_results=test_case_results)
     
+    @staticmethod
+    def _fingerprint_evaluation_data(evaluation_data: EvaluationData) -> str:
+        records = sorted(
+            json.dumps([
+                result.query,
+                result.generated_answer,
+                [document_text(doc) for doc in result.retrieved_documents],
+                result.ground_truth,
+                str(result.question_type),
+                result.entities,
+            ], default=str)
+            for result in evaluation_data.test_case_results
+        )
+        
+        hasher = hashlib.blake2b(digest_size=32)
+        hasher.update(str(get_config().return_detailed_results).encode())
+        for record in records:
+            hasher.update(record.encode())
+        return hasher.hexdigest()
+    
+    def _disk_cache_path(self, metric_id: str) -> Optional[Path]:
+        if self._cache_dir is None or self._data_fingerprint is None:
+            return None
+        return self._cache_dir / f"{metric_id}_{self._data_fingerprint}.pkl"
+    
+    def _load_cached_metric(self, metric_id: str) -> Optional[CachedMetricResult]:
+        cache_path = self._disk_cache_path(metric_id)
+        if cache_path is None:
+            return None
+        
+        try:
+            with open(cache_path, 'rb') as f:
+                return pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            self.logger.warning(f"Ignoring unreadable metric cache {cache_path}: {e}")
+            return None
+    
+    def _store_cached_metric(self, cached_result: CachedMetricResult) -> None:
+        cache_path = self._disk_cache_path(cached_result.metric_id)
+        if cache_path is None:
+            return
+        
+        tmp_path = cache_path.with_name(f"{cache_path.name}.{threading.get_ident()}.tmp")
+        try:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(tmp_path, 'wb') as f:
+                pickle.dump(cached_result, f, protocol=pickle.HIGHEST_PROTOCOL)
+            tmp_path.replace(cache_path)
+        except Exception as e:
+            tmp_path.unlink(missing_ok=True)
+            self.logger.warning(f"Failed to write metric cache {cache_path}: {e}")
+    
+    def _metric_cache_key(self, metric_id: str) -> Tuple[str, Optional[str]]:
+        return metric_id, self._data_fingerprint
+    
+    def _get_cached_metric(self, metric_id: str) -> Optional[CachedMetricResult]:
+        key = self._metric_cache_key(metric_id)
+        with self._metric_cache_lock:
+            cached_result = self._metric_cache.get(key)
+            if cached_result is not None:
+                self._metric_cache.move_to_end(key)
+            return cached_result
+    
+    def _put_cached_metric(self, cached_result: CachedMetricResult) -> None:
+        key = self._metric_cache_key(cached_result.metric_id)
+        with self._metric_cache_lock:
+            self._metric_cache[key] = cached_result
+            self._metric_cache.move_to_end(key)
+            while len(self._metric_cache) > self._metric_cache_size:
+                self._metric_cache.popitem(last=False)
+    
     def _get_or_execute_metric(self, metric_id: str, weight: float, evaluation_data: EvaluationData) -> MetricResult:
-        if metric_id in self._metric_cache:
-            cached_result = self._metric_cache[metric_id]
-
-            self.logger.info(f"Using cached result for metric: {metric_id}")
+        cached_result = self._get_cached_metric(metric_id)
+        if cached_result is not None:
+            self.logger.debug("Using cached result for metric: %s", metric_id)
             
             return MetricResult(
                 metric_id=metric_id,
@@ -186,20 +319,32 @@ class GQMFramework:
                 individual_scores=cached_result.individual_scores
             )
         
-        self.logger.info(f"Executing metric: {metric_id}")
+        cached_result = self._load_cached_metric(metric_id)
+        if cached_result is not None:
+            self.logger.debug("Using disk-cached result for metric: %s", metric_id)
+            self._put_cached_metric(cached_result)
+            
+            return MetricResult(
+                metric_id=metric_id,
+                value=cached_result.value,
+                weight=weight,
+                individual_scores=cached_result.individual_scores
+            )
+        
+        self.logger.debug("Executing metric: %s", metric_id)
         try:
             value = self.metric_executor.execute_metric(metric_id, evaluation_data)
 
             if value is None:
                 return None
         
-            self.logger.info(f"Metric {metric_id} executed with value: {value}")
+            self.logger.debug("Metric %s executed with value: %s", metric_id, value)
             
             if isinstance(value, dict) and get_config().return_detailed_results:
-                score = value.get("score", 0.0)
-                individual_scores = value.get("individual_scores")
+                score = _to_float(value.get("score", 0.0))
+                individual_scores = _pythonize(value.get("individual_scores"))
             else:
-                score = float(value)
+                score = _to_float(value)
                 individual_scores = None
             
             cached_result = CachedMetricResult(
@@ -207,7 +352,8 @@ class GQMFramework:
                 value=score,
                 individual_scores=individual_scores
             )
-            self._metric_cache[metric_id] = cached_result
+            self._put_cached_metric(cached_result)
+            self._store_cached_metric(cached_result)
             
             return MetricResult(
                 metric_id=metric_id,
@@ -220,8 +366,50 @@ class GQMFramework:
             self.logger.error(f"Failed to execute metric {metric_id}: {e}")
             raise
     
+    @staticmethod
+    def _uses_local_model(metric_id: str) -> bool:
+        try:
+            return MetricId(metric_id) in LOCAL_MODEL_METRICS
+        except ValueError:
+            return False
+    
+    def _precompute_metric_cache(self, evaluation_data: EvaluationData) -> None:
+        metric_ids = list(dict.fromkeys(
+            metric_id
+            for goal in self.config.goals
+            for question in goal.questions
+            for metric_id in question.metrics
+            if self._metric_cache_key(metric_id) not in self._metric_cache
+        ))
+        if not metric_ids:
+            return
+        
+        # Model loading overlaps with the API metrics and the local metrics scheduled before it
+        self.metric_executor.preload_models(metric_ids)
+        
+        local_metrics = {metric_id for metric_id in metric_ids if self._uses_local_model(metric_id)}
+        api_count = len(metric_ids) - len(local_metrics)
+        self.logger.info(
+            f"Precomputing {len(metric_ids)} metrics "
+            f"({len(local_metrics)} local-model, {api_count} API)"
+        )
+        
+        with ThreadPoolExecutor(max_workers=1) as local_pool, \
+                ThreadPoolExecutor(max_workers=min(self.config.metric_workers, max(api_count, 1))) as api_pool:
+            futures = {}
+            for metric_id in metric_ids:
+                pool = local_pool if metric_id in local_metrics else api_pool
+                futures[pool.submit(self._get_or_execute_metric, metric_id, 1.0, evaluation_data)] = metric_id
+            
+            for future, metric_id in futures.items():
+                try:
+                    future.result()
+                except Exception as e:
+                    # Left uncached; the goal loop below re-runs it and surfaces the error
+                    self.logger.warning(f"Precomputing metric {metric_id} failed: {e}")
+    
     def evaluate_question(self, question_config: QuestionConfig, evaluation_data: EvaluationData) -> QuestionResult:
-        self.logger.info(f"Evaluating question: {question_config.text}")
+        self.logger.debug("Evaluating question: %s", question_config.text)
         
         metric_results = []
 
@@ -254,10 +442,16 @@ class GQMFramework:
         self.logger.info(f"Starting evaluation with {len(self.config.goals)} goals")
         
         evaluation_data = self._test_rag_system(test_cases, rag_system)
+        # Cached metric results are only valid for the exact RAG outputs they were computed on
+        self._data_fingerprint = self._fingerprint_evaluation_data(evaluation_data)
         
-        self.logger.info("Unloading RAG system to free memory...")
-        self._unload_rag_system(rag_system)
-        time.sleep(5)
+        if self.config.keep_rag_loaded:
+            self._rag_system = rag_system
+        else:
+            self.logger.info("Unloading RAG system to free memory...")
+            self._unload_rag_system(rag_system)
+
+        self._precompute_metric_cache(evaluation_data)
 
         goal_results = []
         for goal_config in self.config.goals:
@@ -268,6 +462,18 @@ class GQMFramework:
             goals=goal_results
         )
     
+    def close(self) -> None:
+        if self._query_pool is not None:
+            self._query_pool.shutdown(wait=True)
+            self._query_pool = None
+        
+        if self._rag_system is not None:
+            self.logger.info("Unloading RAG system to free memory...")
+            self._unload_rag_system(self._rag_system)
+            self._rag_system = None
+        
+        self.metric_executor.release_models()
+    
     def _unload_rag_system(self, rag_system: Any) -> None:
         try:
             if hasattr(rag_system, 'rag_pipeline'):
@@ -284,32 +490,23 @@ class GQMFramework:
             
             rag_system = None
             
-            gc.collect()
-            
-            if torch.cuda.is_available():
-                torch.cuda.empty_cache()
-            elif hasattr(torch, 'mps') and torch.backends.mps.is_available():
-                torch.mps.empty_cache()
+            # Collection usually finishes well within the timeout; otherwise it completes in the background
+            release = threading.Thread(target=self._release_device_memory, name="rag-unload", daemon=True)
+            release.start()
+            release.join(timeout=1.0)
             
             self.logger.info("RAG system unloaded successfully")
             
         except Exception as e:
             self.logger.warning(f"Error while unloading RAG system: {e}")
     
-
-class NumpyEncoder(json.JSONEncoder):
-    def default(self, obj):
-        if isinstance(obj, np.integer):
-            return int(obj)
-        elif isinstance(obj, np.floating):
-            return float(obj)
-        elif isinstance(obj, np.ndarray):
-            return obj.tolist()
-        elif isinstance(obj, np.bool_):
-            return bool(obj)
-        elif hasattr(obj, 'item'):
-            try:
-                return obj.item()
-            except:
-                pass
-        return super().default(obj)
\ No newline at end of file
+    @staticmethod
+    def _release_device_memory() -> None:
+        gc.collect()
+        
+        if torch.cuda.is_available():
+            torch.cuda.synchronize()
+            torch.cuda.empty_cache()
+        elif hasattr(torch, 'mps') and torch.backends.mps.is_available():
+            torch.mps.synchronize()
+            torch.mps.empty_cache()
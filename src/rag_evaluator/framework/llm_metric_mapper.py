@@ -1,12 +1,20 @@
 import json
 import logging
-from typing import List, Dict
+from typing import Any, Dict, Iterator, List, Tuple
 
 from rag_evaluator.config import EvaluationConfig
-from ..constants import MetricId, METRIC_INFO
+from ..constants import METRIC_ID_VALUES, METRIC_INFO
 from ..clients.gemini_client import get_gemini_client
 
 
+# METRIC_INFO never changes at runtime, so its prompt rendering is built once at import
+_AVAILABLE_METRICS_PROMPT_BLOCK = "\n\n".join(
+    f"- {info.name} ({metric_id.value}): {info.description}\n"
+    f"  Use cases: {', '.join(info.use_cases)}"
+    for metric_id, info in METRIC_INFO.items()
+)
+
+
 class LLMMetricMapper:
 
     def __init__(self):
@@ -17,7 +25,8 @@ class LLMMetricMapper:
     def map_all_questions(self, config: EvaluationConfig) -> None:
         self.logger.info("Mapping all questions to metrics")
         
-        questions_data = self._collect_questions_data(config)
+        unmapped_questions = list(self._iter_unmapped_questions(config))
+        questions_data = self._collect_questions_data(unmapped_questions)
         
         if not questions_data:
             self.logger.warning("No questions found to map")
@@ -30,7 +39,7 @@ class LLMMetricMapper:
             
             mappings = self._parse_batch_response(response, questions_data)
             
-            self._apply_mappings_to_config(config, mappings)
+            self._apply_mappings_to_config(unmapped_questions, mappings)
             
             total_questions = len(questions_data)
             mapped_count = sum(1 for mapping in mappings.values() if mapping)
@@ -39,35 +48,25 @@ class LLMMetricMapper:
         except Exception as e:
             self.logger.error(f"Failed to map metrics in batch: {e}")
     
-    def _collect_questions_data(self, config: EvaluationConfig) -> List[Dict]:
-        questions_data = []
-        question_id = 0
-        
-        for goal in config.goals:
-            for question in goal.questions:
-                if not question.metrics:
-                    questions_data.append({
-                        'id': question_id,
-                        'goal_name': goal.name,
-                        'goal_weight': goal.weight,
-                        'question_text': question.text,
-                        'question_weight': question.weight
-                    })
-                    question_id += 1
-        
-        return questions_data
+    @staticmethod
+    def _iter_unmapped_questions(config: EvaluationConfig) -> Iterator[Tuple[int, Any, Any]]:
+        unmapped = ((goal, question) for goal in config.goals for question in goal.questions if not question.metrics)
+        for question_id, (goal, question) in enumerate(unmapped):
+            yield question_id, goal, question
+    
+    def _collect_questions_data(self, unmapped_questions: List[Tuple[int, Any, Any]]) -> List[Dict]:
+        return [
+            {
+                'id': question_id,
+                'goal_name': goal.name,
+                'goal_weight': goal.weight,
+                'question_text': question.text,
+                'question_weight': question.weight
+            }
+            for question_id, goal, question in unmapped_questions
+        ]
     
     def _create_batch_mapping_prompt(self, questions_data: List[Dict]) -> str:
-        available_metrics = []
-        for metric_id, info in METRIC_INFO.items():
-            use_cases_str = ", ".join(info.use_cases)
-            available_metrics.append(
-                f"- {info.name} ({metric_id.value}): {info.description}\n"
-                f"  Use cases: {use_cases_str}"
-            )
-        
-        available_metrics_str = "\n\n".join(available_metrics)
-        
         questions_text = []
         for q_data in questions_data:
             questions_text.append(
@@ -81,7 +80,7 @@ class LLMMetricMapper:
         prompt = f"""You are an expert in RAG (Retrieval Augmented Generation) system evaluation. Your task is to select appropriate metrics and assign relevance weights for evaluating multiple aspects of a RAG system.
 
 Available Metrics:
-{available_metrics_str}
+{_AVAILABLE_METRICS_PROMPT_BLOCK}
 
 Questions to Evaluate:
 {questions_str}
@@ -126,7 +125,6 @@ Response:"""
             json_str = response[start_idx:end_idx]
             
             raw_mappings = json.loads(json_str)
-            available_metric_ids = [mid.value for mid in MetricId]
             
             validated_mappings = {}
             
@@ -140,7 +138,7 @@ Response:"""
                     if isinstance(metric_weights, dict):
                         valid_metric_weights = {}
                         for metric_id, weight in metric_weights.items():
-                            if metric_id in available_metric_ids:
+                            if metric_id in METRIC_ID_VALUES:
                                 weight = max(0.1, min(1.0, float(weight)))
                                 valid_metric_weights[metric_id] = weight
                             else:
@@ -158,12 +156,7 @@ Response:"""
             self.logger.error(f"Failed to parse response: {e}")
             return {}
     
-    def _apply_mappings_to_config(self, config, mappings: Dict[int, Dict[str, float]]) -> None:
-        question_id = 0
-        
-        for goal in config.goals:
-            for question in goal.questions:
-                if not question.metrics:
-                    question.metrics = mappings.get(question_id, {})
-                    
-                    question_id += 1
\ No newline at end of file
+    def _apply_mappings_to_config(self, unmapped_questions: List[Tuple[int, Any, Any]],
+                                  mappings: Dict[int, Dict[str, float]]) -> None:
+        for question_id, _, question in unmapped_questions:
+            question.metrics = mappings.get(question_id, {})
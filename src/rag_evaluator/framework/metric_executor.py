@@ -1,44 +1,84 @@
 import logging
+import threading
+from functools import lru_cache
+from typing import Any, Callable, Dict, Optional
 
 from ..constants import MetricId
 from ..metrics import retrieval_metrics, generation_metrics, system_metrics
-from .evaluation_data import EvaluationData
+from .evaluation_data import BatchedEvaluationData, EvaluationData
+
+
+@lru_cache(maxsize=None)
+def _to_metric_id(metric_id: str) -> Optional[MetricId]:
+    try:
+        return MetricId(metric_id)
+    except ValueError:
+        return None
 
 
 class MetricExecutor:
     
+    _METRIC_FUNCTIONS: Dict[MetricId, Callable[[EvaluationData], Any]] = {
+        MetricId.CONTEXT_PRECISION: retrieval_metrics.context_precision,
+        MetricId.CONTEXT_RECALL: retrieval_metrics.context_recall,
+        MetricId.CONTEXT_RELEVANCE: retrieval_metrics.context_relevance,
+        MetricId.CONTEXT_ENTITIES_RECALL: retrieval_metrics.context_entities_recall,
+        MetricId.FAITHFULNESS: generation_metrics.faithfulness,
+        MetricId.FACTUAL_CONSISTENCY: generation_metrics.factual_consistency,
+        MetricId.ANSWER_RELEVANCE: generation_metrics.answer_relevance,
+        MetricId.BERTSCORE: generation_metrics.bertscore,
+        MetricId.ANSWER_CORRECTNESS: system_metrics.answer_correctness,
+        MetricId.SEMANTIC_DIVERSITY: retrieval_metrics.semantic_diversity,
+        MetricId.ATTRIBUTION_SCORE: generation_metrics.attribution_score,
+        MetricId.ANSWER_COMPLETENESS: generation_metrics.answer_completeness,
+        MetricId.SELF_CONSISTENCY: generation_metrics.self_consistency_score,
+        MetricId.MULTI_HOP_REASONING: system_metrics.multi_hop_reasoning_score,
+        MetricId.CONTEXT_UTILIZATION: system_metrics.context_utilization_rate
+    }
+    
     def __init__(self):
         self.logger = logging.getLogger("rag_evaluator.metric_executor")
+        self._batched: Optional[BatchedEvaluationData] = None
+        self._batched_lock = threading.Lock()
+    
+    def _prepare_batches(self, evaluation_data: EvaluationData) -> BatchedEvaluationData:
+        # Metrics of one evaluation share the same data, so the columns are built only once
+        with self._batched_lock:
+            batched = self._batched
+            if batched is None or batched.test_case_results is not evaluation_data.test_case_results:
+                batched = BatchedEvaluationData.from_evaluation_data(evaluation_data)
+                self._batched = batched
+            return batched
+
+    def preload_models(self, metric_ids) -> Optional[threading.Thread]:
+        """Start loading, in the background, the local models the given metrics will need."""
+        if MetricId.CONTEXT_ENTITIES_RECALL not in {_to_metric_id(metric_id) for metric_id in metric_ids}:
+            return None
+        
+        def _preload() -> None:
+            try:
+                retrieval_metrics.preload_nlp_model()
+            except Exception as e:
+                # The metric loads the model again itself and reports the failure there
+                self.logger.warning(f"Preloading the spaCy model failed: {e}")
+        
+        thread = threading.Thread(target=_preload, name="metric-preload", daemon=True)
+        thread.start()
+        return thread
+
+    def release_models(self) -> None:
+        generation_metrics.release_models()
 
     def execute_metric(self, metric_id: str, evaluation_data: EvaluationData)  -> float | dict:
-        try:
-            metric_enum = MetricId(metric_id)
-        except ValueError:
+        metric_enum = _to_metric_id(metric_id)
+        if metric_enum is None:
             self.logger.error(f"Unknown metric ID: {metric_id}")
             return 0.0
         
-        metric_functions = {
-            MetricId.CONTEXT_PRECISION: lambda: retrieval_metrics.context_precision(evaluation_data),
-            MetricId.CONTEXT_RECALL: lambda: retrieval_metrics.context_recall(evaluation_data),
-            MetricId.CONTEXT_RELEVANCE: lambda: retrieval_metrics.context_relevance(evaluation_data),
-            MetricId.CONTEXT_ENTITIES_RECALL: lambda: retrieval_metrics.context_entities_recall(evaluation_data),
-            MetricId.FAITHFULNESS: lambda: generation_metrics.faithfulness(evaluation_data),
-            MetricId.FACTUAL_CONSISTENCY: lambda: generation_metrics.factual_consistency(evaluation_data),
-            MetricId.ANSWER_RELEVANCE: lambda: generation_metrics.answer_relevance(evaluation_data),
-            MetricId.BERTSCORE: lambda: generation_metrics.bertscore(evaluation_data),
-            MetricId.ANSWER_CORRECTNESS: lambda: system_metrics.answer_correctness(evaluation_data),
-            MetricId.SEMANTIC_DIVERSITY: lambda: retrieval_metrics.semantic_diversity(evaluation_data),
-            MetricId.ATTRIBUTION_SCORE: lambda: generation_metrics.attribution_score(evaluation_data),
-            MetricId.ANSWER_COMPLETENESS: lambda: generation_metrics.answer_completeness(evaluation_data),
-            MetricId.SELF_CONSISTENCY: lambda: generation_metrics.self_consistency_score(evaluation_data),
-            MetricId.MULTI_HOP_REASONING: lambda: system_metrics.multi_hop_reasoning_score(evaluation_data),
-            MetricId.CONTEXT_UTILIZATION: lambda: system_metrics.context_utilization_rate(evaluation_data)
-        }
-        
         try:
-            metric_function = metric_functions.get(metric_enum)
+            metric_function = self._METRIC_FUNCTIONS.get(metric_enum)
             if metric_function:
-                result = metric_function()
+                result = metric_function(self._prepare_batches(evaluation_data))
                 
                 return result
             else:
@@ -1,13 +1,14 @@
 from typing import Dict, List, Optional
 from pathlib import Path
-import subprocess, sys, time, webbrowser, logging
+import socket, subprocess, sys, time, webbrowser, logging
+from concurrent.futures import ThreadPoolExecutor
 
 from rag_evaluator.adapters.langchain import LangChainRAGAdapter
 from rag_evaluator.framework.evaluation_data import TestCase
 
 from ..config import get_config, EvaluationConfig
 from ..constants import QuestionType
-from ..clients.gemini_client import create_gemini_client
+from ..clients.gemini_client import get_gemini_client
 from .gqm import GQMFramework, EvaluationResult
 from ..generators.question_generator import QuestionGenerator
 
@@ -18,7 +19,7 @@ class EvaluationPipeline:
         self.pinecone_config = get_config().get_pinecone_config()
         self.logger = logging.getLogger("rag_evaluator.pipeline")
         
-        create_gemini_client()
+        get_gemini_client()
         
         self.logger.info("Initialized Gemini client")
         
@@ -60,7 +61,13 @@ class EvaluationPipeline:
         start_time = time.time()
         self.logger.info("Starting RAG system evaluation")
         
-        if test_cases is None:
+        if test_cases is None and self.config.warm_up_query:
+            # Question generation is network-bound, so the RAG system's cold start is absorbed alongside it
+            with ThreadPoolExecutor(max_workers=1, thread_name_prefix="test-case-generation") as executor:
+                test_cases_future = executor.submit(self.generate_test_cases, force_regenerate_questions)
+                self.framework.warm_up(rag_system)
+                test_cases = test_cases_future.result()
+        elif test_cases is None:
             test_cases = self.generate_test_cases(force_regenerate_questions)
         
         self.logger.info(f"Using {len(test_cases)} test cases for evaluation")
@@ -84,12 +91,31 @@ class EvaluationPipeline:
         self.logger.info(f"Saved evaluation results to {result_path}")
     
     
+    def close(self) -> None:
+        self.framework.close()
+        self.logger.info("Released evaluation resources")
+    
+    
     def clear_question_cache(self) -> None:
         self.question_generator.cache.clear_cache()
         self.logger.info("Cleared question cache")
 
 
-    def launch_dashboard(self, open_browser: bool = True) -> bool:
+    @staticmethod
+    def _wait_for_port(proc: subprocess.Popen, port: int, timeout: float) -> bool:
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if proc.poll() is not None:
+                return False
+            try:
+                with socket.create_connection(("localhost", port), timeout=0.2):
+                    return True
+            except OSError:
+                time.sleep(0.1)
+        return False
+    
+    
+    def launch_dashboard(self, open_browser: bool = True, startup_timeout: float = 10.0) -> bool:
         logger = logging.getLogger("rag_evaluator.dashboard")
         dashboard_dir = Path(__file__).resolve().parents[3] / "dashboard"
         runner_path = dashboard_dir / "run.py"
@@ -99,14 +125,25 @@ class EvaluationPipeline:
             return False
 
         try:
-            self._dashboard_proc = subprocess.Popen(
-                [sys.executable, str(runner_path)],
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                universal_newlines=True,
-            )
-            logger.info("Dashboard servers starting...")
-            time.sleep(5)
+            log_dir = Path(get_config().output_dir)
+            log_dir.mkdir(parents=True, exist_ok=True)
+            # The child inherits the descriptors, so the parent's handles can be closed right away
+            with open(log_dir / "dashboard.out.log", "ab") as stdout_log, \
+                    open(log_dir / "dashboard.err.log", "ab") as stderr_log:
+                self._dashboard_proc = subprocess.Popen(
+                    [sys.executable, str(runner_path)],
+                    stdout=stdout_log,
+                    stderr=stderr_log,
+                    start_new_session=True,
+                )
+            logger.info("Dashboard servers starting (logs in %s)...", log_dir)
+
+            if not self._wait_for_port(self._dashboard_proc, 5173, startup_timeout):
+                if self._dashboard_proc.poll() is not None:
+                    logger.error("Dashboard runner exited with code %s", self._dashboard_proc.returncode)
+                    return False
+                logger.warning("Dashboard not reachable on port 5173 after %.0f seconds", startup_timeout)
+                return True
 
             if open_browser:
                 webbrowser.open("http://localhost:5173")
@@ -1,54 +1,117 @@
 import hashlib
 import json
+import os
+import pickle
+import time
+from collections import OrderedDict
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 import logging
+import orjson
 
 from rag_evaluator.config import get_config
 from rag_evaluator.framework.evaluation_data import TestCase
 
 
+# Sidecars written for a different TestCase layout are ignored and rebuilt from the JSON
+_SIDECAR_VERSION = ("rag_evaluator.question_cache", 1, tuple(TestCase.__dataclass_fields__))
+
+
 class QuestionCache:
-    def __init__(self):
-        self.cache_dir = Path(get_config().question_cache_dir)
+    def __init__(self, max_entries: int = 64, ttl_seconds: float = 3600.0):
+        app_config = get_config()
+        self.cache_dir = Path(app_config.question_cache_dir)
+        self._index_name = app_config.get_pinecone_config().get('index_name', 'default')
         self.cache_dir.mkdir(exist_ok=True)
         self.logger = logging.getLogger("rag_evaluator.question_cache")
+        # filename -> (loaded_at, mtime_ns, test cases), so repeated lookups in one process skip re-parsing
+        self._loaded: OrderedDict[str, Tuple[float, int, List[TestCase]]] = OrderedDict()
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
     
     def _get_cache_filename(self, generation_config: Dict) -> str:
-        config_str = json.dumps(generation_config, sort_keys=True)
-        config_hash = hashlib.md5(config_str.encode()).hexdigest()[:12]
+        config_hash = hashlib.blake2b(
+            json.dumps(generation_config, sort_keys=True, separators=(",", ":")).encode(),
+            digest_size=8
+        ).hexdigest()
         
-        index_name = get_config().get_pinecone_config().get('index_name', 'default')
-        filename = f"{index_name}_{config_hash}.json"
+        return f"{self._index_name}_{config_hash}.json"
+    
+    def _remember(self, filename: str, mtime_ns: int, test_cases: List[TestCase]) -> None:
+        self._loaded[filename] = (time.monotonic(), mtime_ns, test_cases)
+        self._loaded.move_to_end(filename)
+        while len(self._loaded) > self.max_entries:
+            self._loaded.popitem(last=False)
+    
+    def _load_sidecar(self, cache_file: Path, mtime_ns: int) -> Optional[List[TestCase]]:
+        try:
+            with open(cache_file.with_suffix('.pkl'), 'rb') as f:
+                version, json_mtime_ns, test_cases = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            self.logger.warning(f"Ignoring unreadable question cache sidecar for {cache_file.name}: {e}")
+            return None
         
-        return filename
+        if version != _SIDECAR_VERSION or json_mtime_ns != mtime_ns:
+            return None
+        return test_cases
+    
+    def _write_sidecar(self, cache_file: Path, mtime_ns: int, test_cases: List[TestCase]) -> None:
+        sidecar = cache_file.with_suffix('.pkl')
+        tmp_path = sidecar.with_name(f"{sidecar.name}.tmp")
+        try:
+            with open(tmp_path, 'wb') as f:
+                pickle.dump((_SIDECAR_VERSION, mtime_ns, test_cases), f, protocol=pickle.HIGHEST_PROTOCOL)
+            tmp_path.replace(sidecar)
+        except Exception as e:
+            tmp_path.unlink(missing_ok=True)
+            self.logger.warning(f"Failed to write question cache sidecar for {cache_file.name}: {e}")
     
     def get_cached_questions(self, generation_config: Dict) -> Optional[List[TestCase]]:
         filename = self._get_cache_filename(generation_config)
         cache_file = self.cache_dir / filename
         
-        if cache_file.exists():
-            try:
-                with open(cache_file, 'r') as f:
-                    data = json.load(f)
-                
-                test_cases = []
-                for item in data:
-                    test_case = TestCase(
-                        question=item['question'],
-                        ground_truth=item['ground_truth'],
-                        question_type=item.get('question_type', 'simple'),
-                        entities=item.get('entities', [])
-                    )
-                    test_cases.append(test_case)
-                
-                self.logger.info(f"Loaded {len(test_cases)} cached test cases from {filename}")
-                return test_cases
-                
-            except Exception as e:
-                self.logger.error(f"Failed to load cached questions: {e}")
-                return None
-        return None
+        try:
+            mtime_ns = cache_file.stat().st_mtime_ns
+        except FileNotFoundError:
+            return None
+        
+        loaded = self._loaded.get(filename)
+        if loaded is not None:
+            loaded_at, loaded_mtime_ns, test_cases = loaded
+            if loaded_mtime_ns == mtime_ns and time.monotonic() - loaded_at < self.ttl_seconds:
+                self._loaded.move_to_end(filename)
+                return list(test_cases)
+            del self._loaded[filename]
+        
+        test_cases = self._load_sidecar(cache_file, mtime_ns)
+        if test_cases is not None:
+            self.logger.info(f"Loaded {len(test_cases)} cached test cases from {filename}")
+            self._remember(filename, mtime_ns, test_cases)
+            return list(test_cases)
+        
+        try:
+            data = orjson.loads(cache_file.read_bytes())
+            
+            test_cases = []
+            for item in data:
+                test_case = TestCase(
+                    question=item['question'],
+                    ground_truth=item['ground_truth'],
+                    question_type=item.get('question_type', 'simple'),
+                    entities=item.get('entities') or []
+                )
+                test_cases.append(test_case)
+            
+            self.logger.info(f"Loaded {len(test_cases)} cached test cases from {filename}")
+            self._remember(filename, mtime_ns, test_cases)
+            self._write_sidecar(cache_file, mtime_ns, test_cases)
+            return list(test_cases)
+            
+        except Exception as e:
+            self.logger.error(f"Failed to load cached questions: {e}")
+            return None
     
     def cache_questions(self, test_cases: List[TestCase], generation_config: Dict) -> None:
         filename = self._get_cache_filename(generation_config)
@@ -64,8 +127,10 @@ class QuestionCache:
                     'entities': tc.entities
                 })
             
-            with open(cache_file, 'w') as f:
-                json.dump(data, f, indent=2)
+            cache_file.write_bytes(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+            mtime_ns = cache_file.stat().st_mtime_ns
+            self._remember(filename, mtime_ns, list(test_cases))
+            self._write_sidecar(cache_file, mtime_ns, list(test_cases))
                 
             self.logger.info(f"Cached {len(test_cases)} test cases to {filename}")
             
@@ -73,6 +138,10 @@ class QuestionCache:
             self.logger.error(f"Failed to cache questions: {e}")
     
     def clear_cache(self) -> None:
-        for cache_file in self.cache_dir.glob("*.json"):
-            cache_file.unlink()
+        # One directory pass; only cache files are removed since the directory is user-configurable
+        with os.scandir(self.cache_dir) as entries:
+            for entry in entries:
+                if entry.name.endswith((".json", ".pkl")) and entry.is_file():
+                    os.unlink(entry.path)
+        self._loaded.clear()
         self.logger.info("Cleared question cache")
\ No newline at end of file
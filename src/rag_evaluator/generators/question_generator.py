@@ -1,8 +1,12 @@
-import json
 import random
+import re
+import time
+from collections import Counter
+from itertools import cycle, islice
 import logging
-from typing import Dict, List
+from typing import Any, Dict, List, Optional, Tuple
 import numpy as np
+import orjson
 from pinecone import Pinecone
 
 from rag_evaluator.framework.evaluation_data import TestCase
@@ -12,64 +16,114 @@ from ..clients.gemini_client import get_gemini_client
 from .question_cache import QuestionCache
 
 
+_DOCS_PER_QUERY = 50
+_MAX_QUERY_THREADS = 20
+_QUERY_ATTEMPTS = 3
+_RETRY_BASE_DELAY = 1.0
+_RETRY_MAX_DELAY = 10.0
+_CODE_FENCE_RE = re.compile(r"\A```(?:json)?\s*|\s*```\Z")
+_DOCS_PER_QUESTION = {QuestionType.SIMPLE: 1, QuestionType.COMPLEX: 3}
+_DEFAULT_DOCS_PER_QUESTION = 2
+_CONTEXT_CHARS_PER_DOC = 800
+_CONTEXTS_PER_PROMPT = 8
+
+_TYPE_DESCRIPTIONS = {
+    QuestionType.SIMPLE: "Straightforward factual questions with clear, direct answers",
+    QuestionType.COMPLEX: "Complex questions requiring reasoning or connecting multiple pieces of information",
+    QuestionType.DISTRACTING: "Questions with some distracting information but focusing on the main context",
+    QuestionType.SITUATIONAL: "Questions with user context or specific scenarios",
+    QuestionType.DOUBLE: "Questions with two distinct parts connected by 'and'",
+    QuestionType.CONVERSATIONAL: "Conversational questions as part of an ongoing dialogue"
+}
+
+# An index's dimension is fixed when it is created, so it is fetched once per process
+_index_dimensions: Dict[str, int] = {}
+
+
 class QuestionGenerator:
     def __init__(self):
         self.cache = QuestionCache()
         self.logger = logging.getLogger("rag_evaluator.llm_question_generator")
         self.gemini_client = get_gemini_client()
+        # Reused across generation runs so the HTTP connection pool (and its TLS sessions) survives
+        self._indexes: Dict[Tuple[str, str, int], Any] = {}
     
-    def connect_pinecone(self, api_key: str, index_name: str):
-        pc = Pinecone(api_key=api_key)
-        return pc.Index(index_name)
+    def connect_pinecone(self, api_key: str, index_name: str, pool_threads: int = 1):
+        key = (api_key, index_name, pool_threads)
+        if key not in self._indexes:
+            pc = Pinecone(api_key=api_key)
+            self._indexes[key] = pc.Index(index_name, pool_threads=pool_threads)
+        return self._indexes[key]
+    
+    def _get_query_result(self, index, async_result, query_kwargs: Dict[str, Any]):
+        for attempt in range(1, _QUERY_ATTEMPTS + 1):
+            try:
+                return async_result.get()
+            except Exception as e:
+                status = getattr(e, 'status', None)
+                # Client errors other than rate limiting will not succeed on retry
+                if attempt == _QUERY_ATTEMPTS or (status is not None and 400 <= status < 500 and status != 429):
+                    raise
+                delay = min(_RETRY_MAX_DELAY, _RETRY_BASE_DELAY * 2 ** (attempt - 1)) * random.uniform(0.5, 1.0)
+                self.logger.warning(f"Pinecone query failed (attempt {attempt}/{_QUERY_ATTEMPTS}), retrying in {delay:.1f}s: {e}")
+                time.sleep(delay)
+                async_result = index.query(**query_kwargs, async_req=True)
+    
+    @staticmethod
+    def _plan_sampling_queries(sample_size: int) -> List[int]:
+        docs_per_query = min(_DOCS_PER_QUERY, sample_size)
+        return [min(docs_per_query, sample_size - offset) for offset in range(0, sample_size, docs_per_query)]
     
     def _calculate_documents_needed(self, counts_per_type: Dict[QuestionType, int]) -> int:
-        total_docs = 0
-        
-        for question_type, count in counts_per_type.items():
-            if question_type == QuestionType.SIMPLE:
-                total_docs += count * 1
-            elif question_type == QuestionType.COMPLEX:
-                total_docs += count * 3
-            else:
-                total_docs += count * 2
+        total_docs = sum(
+            count * _DOCS_PER_QUESTION.get(question_type, _DEFAULT_DOCS_PER_QUESTION)
+            for question_type, count in counts_per_type.items()
+        )
         
         buffer = max(5, int(total_docs * 0.1))
         return total_docs + buffer
     
-    def _sample_documents_from_pinecone(self, index, sample_size: int = 100) -> List[Dict]:
+    def _get_dimension(self, index, index_name: Optional[str] = None) -> int:
+        dimension = _index_dimensions.get(index_name) if index_name else None
+        if dimension is None:
+            dimension = index.describe_index_stats()['dimension']
+            if index_name:
+                _index_dimensions[index_name] = dimension
+        return dimension
+    
+    def _sample_documents_from_pinecone(self, index, sample_size: int = 100, index_name: Optional[str] = None) -> List[Dict]:
         documents = []
         
         try:
-            stats = index.describe_index_stats()
-            dimensions = stats['dimension']
+            dimensions = self._get_dimension(index, index_name)
 
-            docs_per_query = min(50, sample_size)
-            num_queries = (sample_size + docs_per_query - 1) // docs_per_query
+            query_limits = self._plan_sampling_queries(sample_size)
             
-            for _ in range(num_queries):
-                if len(documents) >= sample_size:
-                    break
-
-                random_vector = np.random.randn(dimensions)
-                random_vector = random_vector / np.linalg.norm(random_vector)
-
-                remaining_docs = sample_size - len(documents)
-                query_limit = min(docs_per_query, remaining_docs)
-                
-                results = index.query(
-                    vector=random_vector.tolist(),
-                    top_k=query_limit,
-                    include_metadata=True
-                )
-                
-                for match in results.matches:
-                    if match.metadata:
-                        documents.append({
-                            'id': match.id,
-                            'text': match.metadata.get('text', ''),
-                            'source': match.metadata.get('source', 'unknown'),
-                            'score': match.score
-                        })
+            rng = np.random.default_rng()
+            random_vectors = rng.standard_normal((len(query_limits), dimensions), dtype=np.float32)
+            random_vectors /= np.linalg.norm(random_vectors, axis=1, keepdims=True)
+            
+            query_kwargs = [
+                {'vector': random_vector.tolist(), 'top_k': query_limit, 'include_metadata': True}
+                for random_vector, query_limit in zip(random_vectors, query_limits)
+            ]
+            # Dispatched together on the index's thread pool, so sampling costs about one round-trip
+            async_results = [index.query(**kwargs, async_req=True) for kwargs in query_kwargs]
+            
+            # Random query vectors often land near each other, so the same document can come back more than once
+            seen_ids = set()
+            for async_result, kwargs in zip(async_results, query_kwargs):
+                for match in self._get_query_result(index, async_result, kwargs).matches:
+                    if not match.metadata or match.id in seen_ids:
+                        continue
+                    seen_ids.add(match.id)
+                    documents.append({
+                        'id': match.id,
+                        # Only the first 800 chars ever reach a prompt, so the rest is not kept in memory
+                        'text': match.metadata.get('text', '')[:_CONTEXT_CHARS_PER_DOC],
+                        'source': match.metadata.get('source', 'unknown'),
+                        'score': match.score
+                    })
         
         except Exception as e:
             self.logger.error(f"Failed to sample documents from Pinecone: {e}")
@@ -97,8 +151,9 @@ class QuestionGenerator:
         sample_size = self._calculate_documents_needed(counts_per_type)
         self.logger.info(f"{sample_size} documents needed for generation")
         
-        index = self.connect_pinecone(pinecone_config['api_key'], pinecone_config['index_name'])
-        documents = self._sample_documents_from_pinecone(index, sample_size)
+        pool_threads = min(len(self._plan_sampling_queries(sample_size)), _MAX_QUERY_THREADS)
+        index = self.connect_pinecone(pinecone_config['api_key'], pinecone_config['index_name'], pool_threads)
+        documents = self._sample_documents_from_pinecone(index, sample_size, pinecone_config['index_name'])
         
         if not documents:
             raise ValueError("No documents found in Pinecone index")
@@ -118,17 +173,27 @@ class QuestionGenerator:
                                 counts_per_type: Dict[QuestionType, int]) -> List[Dict]:
         contexts = self._prepare_contexts(documents, question_types, counts_per_type)
         
-        prompt = self._create_prompt(contexts, question_types, counts_per_type)
+        # Smaller prompts are prefilled faster and run in parallel; question ids stay global across chunks
+        chunks = [contexts[i:i + _CONTEXTS_PER_PROMPT] for i in range(0, len(contexts), _CONTEXTS_PER_PROMPT)]
+        prompts = []
+        for chunk in chunks:
+            chunk_counts = Counter(QuestionType(ctx['type']) for ctx in chunk)
+            prompts.append(self._create_prompt(chunk, list(chunk_counts), chunk_counts))
         
         try:
-            response = self.gemini_client.generate_for_questions(prompt)
-            questions = self._parse_response(response, contexts)
-            
-            return questions
-            
+            responses = self.gemini_client.generate_batch_for_questions(prompts)
         except Exception as e:
             self.logger.error(f"Failed to generate questions: {e}")
             return []
+        
+        questions = []
+        for chunk, response in zip(chunks, responses):
+            if isinstance(response, Exception):
+                self.logger.error(f"Failed to generate questions {chunk[0]['id']}-{chunk[-1]['id']}: {response}")
+                continue
+            questions.extend(self._parse_response(response, chunk))
+        
+        return questions
     
     def _prepare_contexts(self, 
                                    documents: List[Dict],
@@ -136,38 +201,24 @@ class QuestionGenerator:
                                    counts_per_type: Dict[QuestionType, int]) -> List[Dict]:
         contexts = []
         question_id = 0
-        doc_index = 0
 
         shuffled_docs = documents.copy()
         random.shuffle(shuffled_docs)
+        # Documents are reused round-robin once every one has been picked
+        doc_order = cycle(range(len(shuffled_docs)))
         
         for question_type in question_types:
             count = counts_per_type.get(question_type, 1)
+            docs_needed = _DOCS_PER_QUESTION.get(question_type, _DEFAULT_DOCS_PER_QUESTION)
             
             for i in range(count):
-                if question_type == QuestionType.SIMPLE:
-                    docs_needed = 1
-                elif question_type == QuestionType.COMPLEX:
-                    docs_needed = 3
-                else:
-                    docs_needed = 2
-                
-                selected_docs = []
-                for _ in range(docs_needed):
-                    if doc_index < len(shuffled_docs):
-                        selected_docs.append(shuffled_docs[doc_index])
-                        doc_index += 1
-                    else:
-                        selected_docs.append(shuffled_docs[doc_index % len(shuffled_docs)])
-                        doc_index += 1
-                
-                context_text = "\n\n".join([doc['text'][:800] for doc in selected_docs])
+                selected = list(islice(doc_order, docs_needed))
                 
                 contexts.append({
                     'id': question_id,
                     'type': question_type.value,
-                    'context': context_text,
-                    'source_docs': selected_docs
+                    'context': "\n\n".join([shuffled_docs[doc_index]['text'] for doc_index in selected]),
+                    'source_docs': [shuffled_docs[doc_index] for doc_index in selected]
                 })
                 
                 question_id += 1
@@ -178,29 +229,16 @@ class QuestionGenerator:
                         contexts: List[Dict],
                         question_types: List[QuestionType],
                         counts_per_type: Dict[QuestionType, int]) -> str:
+        summary_text = "\n".join(
+            f"- {counts_per_type.get(question_type, 1)} {question_type.value} questions: "
+            f"{_TYPE_DESCRIPTIONS.get(question_type, 'Relevant questions')}"
+            for question_type in question_types
+        )
         
-        type_descriptions = {
-            QuestionType.SIMPLE: "Straightforward factual questions with clear, direct answers",
-            QuestionType.COMPLEX: "Complex questions requiring reasoning or connecting multiple pieces of information",
-            QuestionType.DISTRACTING: "Questions with some distracting information but focusing on the main context",
-            QuestionType.SITUATIONAL: "Questions with user context or specific scenarios",
-            QuestionType.DOUBLE: "Questions with two distinct parts connected by 'and'",
-            QuestionType.CONVERSATIONAL: "Conversational questions as part of an ongoing dialogue"
-        }
-        
-        generation_summary = []
-        for question_type in question_types:
-            count = counts_per_type.get(question_type, 1)
-            description = type_descriptions.get(question_type, "Relevant questions")
-            generation_summary.append(f"- {count} {question_type.value} questions: {description}")
-        
-        summary_text = "\n".join(generation_summary)
-        
-        contexts_text = []
-        for ctx in contexts:
-            contexts_text.append(f"Question {ctx['id']} ({ctx['type']}):\nContext: {ctx['context']}")
-        
-        contexts_str = "\n\n".join(contexts_text)
+        contexts_str = "\n\n".join(
+            f"Question {ctx['id']} ({ctx['type']}):\nContext: {ctx['context']}"
+            for ctx in contexts
+        )
         
         prompt = f"""You are an expert at generating evaluation questions for RAG (Retrieval Augmented Generation) systems. Generate questions based on the provided contexts.
 
@@ -239,21 +277,15 @@ Response:"""
     def _parse_response(self, response: str, contexts: List[Dict]) -> List[TestCase]:
         """Simplified parsing to create TestCase objects"""
         try:
-            # Clean response
-            response = response.strip()
             # log response for debugging
-            self.logger.debug(f"Raw response from Gemini: {response}...")
-            if response.startswith("```json"):
-                response = response[7:-3]
-            elif response.startswith("```"):
-                response = response[3:-3]
-            
-            # Extract JSON
-            start_idx = response.find('{')
-            end_idx = response.rfind('}') + 1
-            json_str = response[start_idx:end_idx]
+            self.logger.debug("Raw response from Gemini: %s...", response)
             
-            raw_questions = json.loads(json_str)
+            # Questions are requested in JSON mode; fences are only stripped in case the model adds them anyway
+            json_str = _CODE_FENCE_RE.sub("", response.strip())
+            try:
+                raw_questions = orjson.loads(json_str)
+            except orjson.JSONDecodeError:
+                raw_questions = orjson.loads(json_str[json_str.find('{'):json_str.rfind('}') + 1])
             
             test_cases = []
             for ctx in contexts:
@@ -267,7 +299,7 @@ Response:"""
                             question=q_data['question'].strip(),
                             ground_truth=q_data['ground_truth'].strip(),
                             question_type=ctx['type'],
-                            entities=q_data.get('entities', [])
+                            entities=q_data.get('entities') or []
                         )
                         test_cases.append(test_case)
                         
@@ -1,6 +1,10 @@
 import os
-from typing import List
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import List, Tuple
 import numpy as np
+import orjson
 import torch
 from transformers import AutoModelForSequenceClassification
 from bert_score import BERTScorer
@@ -10,7 +14,8 @@ import logging
 from rag_evaluator.clients.voyage_client import embed_texts
 from rag_evaluator.config import get_config
 
-from ..framework.evaluation_data import EvaluationData
+from ..framework.evaluation_data import BatchedEvaluationData, EvaluationData
+from .scoring import parse_score
 from ..clients.gemini_client import GeminiClient, get_gemini_client
 
 
@@ -33,12 +38,65 @@ class HHEM:
             trust_remote_code=True
         )
         self.model.to(self.device)
+        # HHEM is T5-based and overflows in fp16, so only bf16-capable GPUs get reduced precision
+        if self.device.type == "cuda" and torch.cuda.is_bf16_supported():
+            self.model.to(torch.bfloat16)
+        elif self.device.type == "cpu" and get_config().hhem_cpu_int8:
+            # Dynamic int8 quantization of the linear layers speeds up CPU inference at a small accuracy cost
+            self.model = torch.ao.quantization.quantize_dynamic(self.model, {torch.nn.Linear}, dtype=torch.qint8)
         self.model.eval()
-
-    def _score_pairs(self, premises: List[str], hypotheses: List[str]) -> List[float]:
-        pairs = list(zip(premises, hypotheses))
-        scores = self.model.predict(pairs)
-        return scores.tolist()
+        self._tokenizer, self._prompt_head = self._prompt_layout()
+        
+        if self.device.type == "cuda" and get_config().hhem_compile:
+            # predict() calls the submodules directly, so compile those and trigger compilation with a dummy pair
+            for module in self.model.children():
+                module.compile(mode="reduce-overhead", dynamic=True)
+            self._score_pairs([" "], [" "])
+
+    def _prompt_layout(self):
+        """The model's tokenizer and the part of its prompt before the hypothesis, or (None, None) if the layout is unknown."""
+        tokenizer = getattr(self.model, "tokenzier", None) or getattr(self.model, "tokenizer", None)
+        prompt = getattr(self.model, "prompt", None)
+        if tokenizer is None or not hasattr(self.model, "t5") or not isinstance(prompt, str) or not prompt.endswith("{text2}"):
+            return None, None
+        return tokenizer, prompt[:-len("{text2}")].rstrip()
+    
+    def _encode_pairs(self, premises: List[str], hypotheses: List[str]) -> List[List[int]]:
+        # Claims of one test case share their premise, so each distinct premise is tokenized once and its ids reused
+        unique_premises = list(dict.fromkeys(premises))
+        heads = self._tokenizer([self._prompt_head.format(text1=premise) for premise in unique_premises],
+                                add_special_tokens=False).input_ids
+        head_ids = dict(zip(unique_premises, heads))
+        hypothesis_ids = self._tokenizer(list(hypotheses)).input_ids
+        return [head_ids[premise] + ids for premise, ids in zip(premises, hypothesis_ids)]
+    
+    def _predict_encoded(self, sequences: List[List[int]]):
+        inputs = self._tokenizer.pad({"input_ids": sequences}, return_tensors="pt")
+        if self.device.type == "cuda":
+            # Copies from pinned memory don't block the CPU, so the next chunk is padded while this one runs
+            inputs = {name: tensor.pin_memory().to(self.device, non_blocking=True) for name, tensor in inputs.items()}
+        else:
+            inputs = inputs.to(self.device)
+        logits = self.model.t5(**inputs).logits[:, 0, :]
+        return torch.softmax(logits, dim=-1)[:, 1]
+
+    def _score_pairs(self, premises: List[str], hypotheses: List[str], batch_size: int = 32) -> List[float]:
+        # predict() pads a whole call to its longest pair, so large inputs are scored in fixed-size chunks
+        scores = []
+        with torch.inference_mode():
+            if self._tokenizer is None:
+                pairs = list(zip(premises, hypotheses))
+                for start in range(0, len(pairs), batch_size):
+                    scores.extend(self.model.predict(pairs[start:start + batch_size]).tolist())
+                return scores
+            
+            sequences = self._encode_pairs(premises, hypotheses)
+            # Results stay on the device until every chunk is queued, so there is one sync instead of one per chunk
+            outputs = [
+                self._predict_encoded(sequences[start:start + batch_size])
+                for start in range(0, len(sequences), batch_size)
+            ]
+        return torch.cat(outputs).tolist() if outputs else []
     
     def score_claim(self, claim: str, context: str) -> float:
         score = self._score_pairs([context], [claim])[0]
@@ -47,13 +105,42 @@ class HHEM:
     def batch_score(self, claims: List[str], contexts: List[str]) -> List[float]:
         return self._score_pairs(contexts, claims)
     
+    def _premise_windows(self, premise: str, max_len: int, stride: int) -> List[str]:
+        if self._tokenizer is None:
+            return [premise]
+        ids = self._tokenizer.encode(premise, add_special_tokens=False)
+        if len(ids) <= max_len:
+            return [premise]
+        step = max_len - stride
+        return [self._tokenizer.decode(ids[start:start + max_len]) for start in range(0, len(ids) - stride, step)]
+    
+    def batch_score_windowed(self, claims: List[str], contexts: List[str],
+                             max_len: int = 480, stride: int = 64) -> List[float]:
+        """Like batch_score, but contexts longer than max_len tokens are scored as overlapping windows, keeping each claim's best."""
+        windows = {context: self._premise_windows(context, max_len, stride) for context in dict.fromkeys(contexts)}
+        premises = []
+        hypotheses = []
+        owners = []
+        for index, (claim, context) in enumerate(zip(claims, contexts)):
+            for window in windows[context]:
+                premises.append(window)
+                hypotheses.append(claim)
+                owners.append(index)
+        
+        best = np.full(len(claims), -np.inf)
+        np.maximum.at(best, owners, self._score_pairs(premises, hypotheses))
+        return best.tolist()
+    
 
 _hhem_instance = None
+_hhem_lock = threading.Lock()
 
 def get_hhem():
     global _hhem_instance
     if _hhem_instance is None:
-        _hhem_instance = HHEM()
+        with _hhem_lock:
+            if _hhem_instance is None:
+                _hhem_instance = HHEM()
     return _hhem_instance
 
 def clear_hhem():
@@ -70,62 +157,135 @@ def clear_hhem():
             torch.mps.empty_cache()
 
 
-def _extract_claims_with_llm(text: str, model: GeminiClient) -> List[str]:
-    prompt = f"""Extract only factual claims from this text.
+_bertscorer_instance = None
+_bertscorer_key = None
+
+def _get_bertscorer(device: str, model_type: str) -> BERTScorer:
+    global _bertscorer_instance, _bertscorer_key
+    if _bertscorer_instance is None or _bertscorer_key != (device, model_type):
+        _bertscorer_instance = BERTScorer(
+            model_type=model_type,
+            lang="en",
+            device=device,
+            use_fast_tokenizer=True,
+            batch_size=8,
+            idf=False,
+            rescale_with_baseline=False)
+        _bertscorer_key = (device, model_type)
+    return _bertscorer_instance
+
+def clear_bertscorer():
+    global _bertscorer_instance, _bertscorer_key
+    if _bertscorer_instance is not None:
+        import gc
+        _bertscorer_instance = None
+        _bertscorer_key = None
+        gc.collect()
+        if torch.cuda.is_available():
+            torch.cuda.empty_cache()
+        elif torch.backends.mps.is_available():
+            torch.mps.empty_cache()
+
+
+def release_models():
+    """Free the local models the metrics keep loaded between calls."""
+    clear_hhem()
+    clear_bertscorer()
+
+
+# "1. text" lines of a numbered list, capturing the text
+_NUMBERED_LINE_RE = re.compile(r'^[ \t]*\d{1,2}\.[ \t]*(\S.*?)\s*$', re.MULTILINE)
+
+# Answers sent to Gemini together in one claim-extraction prompt
+_ANSWERS_PER_CLAIMS_PROMPT = 10
+
+
+def _claims_prompt(texts: List[str]) -> str:
+    answers = "\n\n".join(f"L{i}.A: {text}" for i, text in enumerate(texts, 1))
+    return f"""Extract only factual claims from each of the answers below.
 Each claim should be a single, verifiable statement.
-List only the claims, nothing else.
+Tag every claim with the position (L1, L2, ...) of the answer it comes from.
+Answers without factual claims get no entries.
 
-Text: {text}
+{answers}
 
-Example claims:
-1. [First claim]
-2. [Second claim]
-3. [Third claim]
+Respond with JSON only, in the form:
+{{"claims": [{{"position": "L1", "claim_text": "[First claim]"}}, {{"position": "L1", "claim_text": "[Second claim]"}}, {{"position": "L2", "claim_text": "[First claim]"}}]}}"""
 
-Claims:"""
-    
+
+def _parse_claims_response(response: str, count: int) -> List[List[str]]:
     try:
-        response = model.generate_for_metrics(prompt)
-        
-        claims = []
-        for line in response.split('\n'):
-            if line.strip() and any(line.strip().startswith(str(i)) for i in range(1, 21)):
-                claim = re.sub(r'^\d+\.\s*', '', line.strip())
-                if claim:
-                    claims.append(claim)
-        
-        return claims
-        
-    except Exception as e:
-        return [text.strip()] if text.strip() else []
+        parsed = orjson.loads(response)
+    except orjson.JSONDecodeError:
+        parsed = orjson.loads(response[response.find('{'):response.rfind('}') + 1])
+    
+    claims = [[] for _ in range(count)]
+    for entry in parsed.get("claims", []):
+        position = str(entry.get("position", "")).strip().upper()
+        claim = str(entry.get("claim_text", "")).strip()
+        if claim and position[:1] == "L" and position[1:].isdigit() and 1 <= int(position[1:]) <= count:
+            claims[int(position[1:]) - 1].append(claim)
+    
+    return claims
+
+
+def _extract_claims_with_llm(texts: List[str], model: GeminiClient,
+                             batch_size: int = _ANSWERS_PER_CLAIMS_PROMPT) -> List[List[str]]:
+    """Extract claims for several texts, `batch_size` per prompt; texts of a failed prompt become their own single claim."""
+    chunks = [texts[i:i + batch_size] for i in range(0, len(texts), batch_size)]
+    responses = model.generate_batch_for_claims([_claims_prompt(chunk) for chunk in chunks])
+    
+    all_claims = []
+    for chunk, response in zip(chunks, responses):
+        try:
+            if isinstance(response, Exception):
+                raise response
+            all_claims.extend(_parse_claims_response(response, len(chunk)))
+        except Exception as e:
+            logging.getLogger("rag_evaluator.faithfulness").warning(f"Failed to extract claims for {len(chunk)} answers: {e}")
+            all_claims.extend([text.strip()] if text.strip() else [] for text in chunk)
+    
+    return all_claims
 
 
 def faithfulness(evaluation_data: EvaluationData)  -> float | dict:
     model = get_gemini_client()
     
     hhem = get_hhem()
+    batched = BatchedEvaluationData.from_evaluation_data(evaluation_data)
     
     total_faithfulness = 0.0
     count = 0
     detailed_results = []
+    detailed = get_config().return_detailed_results
     
-    for result in evaluation_data.test_case_results:
-        if not result.retrieved_documents or not result.generated_answer:
+    # Claims from every test case are scored in one HHEM pass, then split back per case
+    scored = [
+        index for index, result in enumerate(batched.test_case_results)
+        if result.retrieved_documents and result.generated_answer
+    ]
+    extracted = _extract_claims_with_llm([batched.answers[index] for index in scored], model)
+    
+    case_claims = [None] * len(batched.test_case_results)
+    all_claims = []
+    all_contexts = []
+    for index, claims in zip(scored, extracted):
+        case_claims[index] = claims
+        all_claims.extend(claims)
+        all_contexts.extend([batched.combined_contexts[index]] * len(claims))
+    
+    all_scores = np.asarray(hhem.batch_score_windowed(all_claims, all_contexts) if all_claims else [], dtype=float)
+    
+    offset = 0
+    for result, claims in zip(batched.test_case_results, case_claims):
+        # Cases without claims contributed nothing to the HHEM batch and score 0
+        if not claims:
             total_faithfulness += 0.0
             count += 1
             continue
         
-        claims = _extract_claims_with_llm(result.generated_answer, model)
-        
-        contexts = [
-            doc.get_content() if hasattr(doc, "get_content") else str(doc)
-            for doc in result.retrieved_documents
-        ]
-        combined_context = "\n\n".join(contexts)
-        
-        context_list = [combined_context] * len(claims)
-        
-        scores = hhem.batch_score(claims, context_list)
+        scores = all_scores[offset:offset + len(claims)]
+        offset += len(claims)
         
         weights = []
         for claim in claims:
@@ -140,7 +300,7 @@ def faithfulness(evaluation_data: EvaluationData)  -> float | dict:
         total_faithfulness += case_faithfulness
         count += 1
 
-        if get_config().return_detailed_results:
+        if detailed:
             detailed_results.append({
                 "query": result.query,
                 "generated_answer": result.generated_answer,
@@ -150,9 +310,7 @@ def faithfulness(evaluation_data: EvaluationData)  -> float | dict:
 
     overall_score = total_faithfulness / count if count > 0 else 0.0
 
-    clear_hhem()
-
-    if get_config().return_detailed_results:
+    if detailed:
         return {
             "score": overall_score,
             "individual_scores": detailed_results
@@ -164,32 +322,35 @@ def faithfulness(evaluation_data: EvaluationData)  -> float | dict:
 def factual_consistency(evaluation_data: EvaluationData)  -> float | dict:
 
     hhem = get_hhem()
+    batched = BatchedEvaluationData.from_evaluation_data(evaluation_data)
     
     total_consistency = 0.0
     count = 0
     detailed_results = []
+    detailed = get_config().return_detailed_results
     
-    for result in evaluation_data.test_case_results:
+    scored = [
+        (result, combined_context)
+        for result, combined_context in zip(batched.test_case_results, batched.combined_contexts)
+        if result.retrieved_documents and result.generated_answer
+    ]
+    scores = iter(hhem.batch_score(
+        [result.generated_answer for result, _ in scored],
+        [combined_context for _, combined_context in scored]
+    ) if scored else [])
+    
+    for result in batched.test_case_results:
         if not result.retrieved_documents or not result.generated_answer:
             total_consistency += 0.0
             count += 1
             continue
         
-        contexts = [
-            doc.get_content() if hasattr(doc, "get_content") else str(doc)
-            for doc in result.retrieved_documents
-        ]
-        combined_context = "\n\n".join(contexts)
-        
-        consistency_score = hhem.score_claim(
-            result.generated_answer,
-            combined_context
-        )
+        consistency_score = next(scores)
         
         total_consistency += consistency_score
         count += 1
 
-        if get_config().return_detailed_results:
+        if detailed:
             detailed_results.append({
                 "query": result.query,
                 "generated_answer": result.generated_answer,
@@ -199,9 +360,7 @@ def factual_consistency(evaluation_data: EvaluationData)  -> float | dict:
 
     overall_score = total_consistency / count if count > 0 else 0.0
 
-    clear_hhem()
-
-    if get_config().return_detailed_results:
+    if detailed:
         return {
             "score": overall_score,
             "individual_scores": detailed_results
@@ -210,6 +369,10 @@ def factual_consistency(evaluation_data: EvaluationData)  -> float | dict:
     return overall_score
 
 
+def _cos(a: np.ndarray, b: np.ndarray) -> float:
+    return float(np.dot(a, b) / (np.sqrt(np.vdot(a, a) * np.vdot(b, b)) + 1e-12))
+
+
 def answer_relevance(evaluation_data: EvaluationData)  -> float | dict:    
     logger = logging.getLogger("rag_evaluator.answer_relevance")
     model = get_gemini_client()
@@ -217,14 +380,14 @@ def answer_relevance(evaluation_data: EvaluationData)  -> float | dict:
     total_relevance = 0.0
     count = 0
     detailed_results = []
+    detailed = get_config().return_detailed_results
     
+    prompts = []
     for result in evaluation_data.test_case_results:
         if not result.generated_answer:
-            total_relevance += 0.0
-            count += 1
             continue
         
-        prompt = f"""Given this answer, generate 3 questions that this answer directly addresses.
+        prompts.append(f"""Given this answer, generate 3 questions that this answer directly addresses.
 Each question should capture different aspects of the answer.
 Questions should be natural and specific.
 
@@ -237,33 +400,34 @@ Example questions:
 2. [Second question]
 3. [Third question]
 
-Questions:"""
+Questions:""")
+    
+    responses = iter(model.generate_batch_for_metrics(prompts))
+    
+    for result in evaluation_data.test_case_results:
+        if not result.generated_answer:
+            total_relevance += 0.0
+            count += 1
+            continue
         
+        response = next(responses)
         try:
-            response = model.generate_for_metrics(prompt)
+            if isinstance(response, Exception):
+                raise response
             
-            generated_questions = []
-            for line in response.split('\n'):
-                if line.strip() and any(line.strip().startswith(str(i)) for i in range(1, 4)):
-                    question = re.sub(r'^\d+\.\s*', '', line.strip())
-                    if question:
-                        generated_questions.append(question)
+            generated_questions = [match.group(1) for match in _NUMBERED_LINE_RE.finditer(response)]
             
             if not generated_questions:
                 generated_questions = [response.strip()]
             
             all_texts = [result.query] + generated_questions
-            embeddings = embed_texts(all_texts)
-            
-            original_embedding = embeddings[0]
-            generated_embeddings = embeddings[1:]
-            
-            similarities = []
-            for gen_emb in generated_embeddings:
-                sim = np.dot(original_embedding, gen_emb) / (
-                    np.linalg.norm(original_embedding) * np.linalg.norm(gen_emb)
-                )
-                similarities.append(float(sim))
+            embeddings = np.asarray(embed_texts(all_texts), dtype=np.float32)
+            if len(embeddings) == 2:
+                similarities = [_cos(embeddings[1], embeddings[0])]
+            else:
+                embeddings /= np.linalg.norm(embeddings, axis=1, keepdims=True) + 1e-12
+                # Rows are unit-length, so one matrix-vector product gives every cosine similarity to the query
+                similarities = (embeddings[1:] @ embeddings[0]).tolist()
             
             similarities_sorted = sorted(similarities, reverse=True)
             if len(similarities_sorted) >= 3:
@@ -280,7 +444,7 @@ Questions:"""
         total_relevance += relevance_score
         count += 1
 
-        if get_config().return_detailed_results:
+        if detailed:
             detailed_results.append({
                 "query": result.query,
                 "generated_answer": result.generated_answer,
@@ -290,7 +454,7 @@ Questions:"""
 
     overall_score = total_relevance / count if count > 0 else 0.0
 
-    if get_config().return_detailed_results:
+    if detailed:
         return {
             "score": overall_score,
             "individual_scores": detailed_results
@@ -303,31 +467,26 @@ def bertscore(evaluation_data):
     logger = logging.getLogger("rag_evaluator.bertscore")
     device = get_optimal_device().type
     model_type = get_config().bertscore_model
+    batched = BatchedEvaluationData.from_evaluation_data(evaluation_data)
 
-    scorer = BERTScorer(
-        model_type=model_type, 
-        lang="en",
-        device=device,
-        use_fast_tokenizer=True, 
-        batch_size=8,
-        idf=False,
-        rescale_with_baseline=False)
+    scorer = _get_bertscorer(device, model_type)
     
-    all_scores = []
+    total_f1 = 0.0
+    count = 0
     detailed_results = []
+    detailed = get_config().return_detailed_results
     all_zero = True
 
-    for test in evaluation_data.test_case_results:
-        answer = test.generated_answer
-        docs = test.retrieved_documents
-        if not answer or not docs:
+    # Collect every (answer, context) pair up front so BERTScore sees one large batch
+    candidates = []
+    references = []
+    ranges = []
+    for test, answer, texts in zip(batched.test_case_results, batched.answers, batched.contexts):
+        if not answer or not texts:
             continue
 
         contexts = []
-        for doc in docs:
-            text = doc.get_content() if hasattr(doc, "get_content") else str(doc)
-            if text is None: 
-                text = ""
+        for text in texts:
             text = text.strip()
             if text == "":
                 logger.warning(f"Warning: empty context for query '{test.query}' will be skipped.")
@@ -337,44 +496,64 @@ def bertscore(evaluation_data):
             logger.warning(f"Warning: no valid context text for query '{test.query}'. Skipping BERTScore.")
             continue
 
+        start = len(references)
+        candidates.extend([answer] * len(contexts))
+        references.extend(contexts)
+        ranges.append((test, start, len(references)))
+
+    def score_pairs(cands, refs):
+        nonlocal scorer
         try:
-            P, R, F = scorer.score([answer] * len(contexts), contexts)
+            # Mixed precision on CUDA; RoBERTa-style encoders stay accurate under fp16 autocast
+            with torch.autocast(device_type="cuda", dtype=torch.float16, enabled=device == "cuda"):
+                return scorer.score(cands, refs, batch_size=64)[2]
         except Exception as e:
-            if device == "mps":
-                logger.info(f"Error on MPS (will retry on CPU): {e}")
-                scorer = BERTScorer(model_type="roberta-large", lang="en", 
-                                    device="cpu", use_fast_tokenizer=True, 
-                                    batch_size=4, idf=False, rescale_with_baseline=False)
-                P, R, F = scorer.score([answer] * len(contexts), contexts)
-            else:
+            if device != "mps":
+                raise
+            logger.info(f"Error on MPS (will retry on CPU): {e}")
+            scorer = _get_bertscorer("cpu", model_type)
+            return scorer.score(cands, refs, batch_size=4)[2]
+
+    F = None
+    if ranges:
+        try:
+            F = score_pairs(candidates, references)
+        except Exception as e:
+            logger.info(f"Batched BERTScore failed, scoring test cases individually: {e}")
+
+    for test, start, end in ranges:
+        if F is not None:
+            case_F = F[start:end]
+        else:
+            try:
+                case_F = score_pairs(candidates[start:end], references[start:end])
+            except Exception as e:
                 logger.info(f"Error computing score for query '{test.query}': {e}")
                 continue
 
-        F1_scores = F.tolist() if hasattr(F, 'tolist') else list(F)
-        max_F1 = max(F1_scores) if F1_scores else 0.0
-        all_scores.append(max_F1)
+        # Every range holds at least one context, so the slice is never empty
+        max_F1 = case_F.max().item()
+        total_f1 += max_F1
+        count += 1
         if max_F1 > 0:
             all_zero = False
 
-        if get_config().return_detailed_results:
+        if detailed:
             detailed_results.append({
                 "query": test.query,
-                "generated_answer": answer,
+                "generated_answer": test.generated_answer,
                 "question_type": test.question_type,
                 "score": max_F1,
             })
     
-    if all_scores:
-        overall_score = sum(all_scores) / len(all_scores)
-    else:
-        overall_score = 0.0
+    overall_score = total_f1 / count if count > 0 else 0.0
 
-    if all_zero and all_scores:
+    if all_zero and count > 0:
         logger.warning("WARNING: All BERTScore F1 scores are 0.0. This may indicate a configuration issue (e.g., IDF or device problems).")
-    elif not all_scores:
+    elif count == 0:
         logger.warning("WARNING: No BERTScore could be computed (all test cases skipped or failed).")
 
-    if get_config().return_detailed_results:
+    if detailed:
         return {"score": overall_score, "individual_scores": detailed_results}
     else:
         return overall_score
@@ -384,20 +563,28 @@ def attribution_score(evaluation_data: EvaluationData)  -> float | dict:
     logger = logging.getLogger("rag_evaluator.attribution_score")
     model = get_gemini_client()
     
-    total_scores = []
+    total_score = 0.0
+    count = 0
     detailed_results = []
+    detailed = get_config().return_detailed_results
     
-    for result in evaluation_data.test_case_results:
+    batched = BatchedEvaluationData.from_evaluation_data(evaluation_data)
+    
+    # Document texts come from the shared batched columns, and each distinct source list is rendered once
+    source_texts = {}
+    cases = []
+    prompts = []
+    for result, sources in zip(batched.test_case_results, batched.contexts):
         if not result.generated_answer or not result.retrieved_documents:
             continue
         
-        sources = [
-            doc.get_content() if hasattr(doc, "get_content") else str(doc)
-            for doc in result.retrieved_documents
-        ]
-        source_text = "\n\n".join([f"[Source {i+1}]\n{src[:500]}" for i, src in enumerate(sources)])
+        key = tuple(sources)
+        source_text = source_texts.get(key)
+        if source_text is None:
+            source_text = source_texts[key] = "\n\n".join([f"[Source {i+1}]\n{src[:500]}" for i, src in enumerate(sources)])
         
-        prompt = f"""Evaluate attribution quality.
+        cases.append(result)
+        prompts.append(f"""Evaluate attribution quality.
 
 Query: {result.query}
 
@@ -411,26 +598,32 @@ Score (0-10) based on:
 - Do cited sources actually contain the information?
 - Are attributions clear and specific?
 
-Output only the numeric score."""
+Output only the numeric score.""")
 
-        try:
-            response = model.generate_for_metrics(prompt)
-            score = float(re.search(r'(\d+(?:\.\d+)?)', response).group(1)) / 10.0
-            total_scores.append(score)
-
-            if get_config().return_detailed_results:
-                detailed_results.append({
-                    "query": result.query,
-                    "generated_answer": result.generated_answer,
-                    "question_type": result.question_type,
-                    "score": score,
-                })
-        except Exception as e:
-            logger.warning(f"Failed to parse attribution score: {e}")
+    for result, response in zip(cases, model.generate_batch_for_metrics(prompts)):
+        if isinstance(response, Exception):
+            logger.warning(f"Failed to get attribution score: {response}")
+            continue
+        
+        score = parse_score(response)
+        if score is None:
+            logger.warning(f"No attribution score in response: {response[:100]!r}")
+            continue
+        
+        total_score += score
+        count += 1
+
+        if detailed:
+            detailed_results.append({
+                "query": result.query,
+                "generated_answer": result.generated_answer,
+                "question_type": result.question_type,
+                "score": score,
+            })
     
-    overall_score = np.mean(total_scores) if total_scores else 0.0
+    overall_score = total_score / count if count > 0 else 0.0
 
-    if get_config().return_detailed_results:
+    if detailed:
         return {
             "score": overall_score,
             "individual_scores": detailed_results
@@ -439,47 +632,106 @@ Output only the numeric score."""
     return overall_score
 
 
-def answer_completeness(evaluation_data: EvaluationData)  -> float | dict:
-    logger = logging.getLogger("rag_evaluator.attribution_score")
-    model = get_gemini_client()
-    
-    total_completeness = 0.0
-    count = 0
-    detailed_results = []
-    
-    for result in evaluation_data.test_case_results:
-        if not result.generated_answer:
-            continue
-        
-        prompt = f"""Analyze answer completeness.
+# answer_completeness and self_consistency_score share one Gemini call per answer; results are kept per (query, answer)
+_ANSWER_ANALYSIS_CACHE_SIZE = 1024
+_answer_analysis_cache: "OrderedDict[Tuple[str, str], Future]" = OrderedDict()
+_answer_analysis_lock = threading.Lock()
 
-Query: {result.query}
 
-Answer: {result.generated_answer}
+# The reply must open with "completeness, consistency"; "8/10, 9/10" and other shapes are rejected
+_SCORE_PAIR_RE = re.compile(r'\s*\[?\s*(\d+(?:\.\d+)?)\s*,\s*(\d+(?:\.\d+)?)(?![\d.]*\s*/)')
+
+
+def _answer_analysis_prompt(query: str, answer: str) -> str:
+    return f"""Analyze answer completeness and internal consistency.
+
+Query: {query}
 
-First, identify all aspects/sub-questions in the query.
-Then, check which aspects are addressed in the answer.
+Answer: {answer}
 
-Provide completeness score (0-10) based on:
+Completeness: identify all aspects/sub-questions in the query, then check which aspects are addressed in the answer.
+Score it (0-10) based on:
 1. All query aspects addressed
 2. Sufficient depth for each aspect
 3. No important information missing
 
-Output only the numeric score.
+Consistency: look for
+1. Contradictory statements
+2. Logical inconsistencies
+3. Conflicting facts or claims
+4. Unclear or ambiguous statements
+Score it (0-10), where 10 is perfectly consistent.
+
+Return two scores separated by a comma: completeness, consistency. No prose.
+
+Scores:"""
+
+
+def _combined_answer_analysis(results: List, model: GeminiClient) -> List[Future]:
+    """Futures resolving to the (completeness, consistency) scores in 0-1 of each result, asking Gemini only for unseen answers."""
+    futures = []
+    pending = []
+    with _answer_analysis_lock:
+        for result in results:
+            key = (result.query, result.generated_answer)
+            future = _answer_analysis_cache.get(key)
+            if future is None:
+                future = _answer_analysis_cache[key] = Future()
+                pending.append((key, result, future))
+            _answer_analysis_cache.move_to_end(key)
+            futures.append(future)
+        while len(_answer_analysis_cache) > _ANSWER_ANALYSIS_CACHE_SIZE:
+            _answer_analysis_cache.popitem(last=False)
+    
+    prompts = [_answer_analysis_prompt(result.query, result.generated_answer) for _, result, _ in pending]
+    try:
+        responses = model.generate_batch_for_metrics(prompts)
+    except Exception as e:
+        # Other metrics may be waiting on these futures, so every one of them must be resolved
+        responses = [e] * len(pending)
+    
+    for (key, _, future), response in zip(pending, responses):
+        try:
+            if isinstance(response, Exception):
+                raise response
+            match = _SCORE_PAIR_RE.match(response)
+            if match is None:
+                raise ValueError(f"expected 'completeness, consistency' scores, got {response[:100]!r}")
+            completeness, consistency = (min(max(float(score) / 10.0, 0.0), 1.0) for score in match.groups())
+            future.set_result((completeness, consistency))
+        except Exception as e:
+            # Failures are not cached, so the next evaluation asks again
+            with _answer_analysis_lock:
+                if _answer_analysis_cache.get(key) is future:
+                    del _answer_analysis_cache[key]
+            future.set_exception(e)
+    
+    return futures
 
-Score:"""
-        
+
+def answer_completeness(evaluation_data: EvaluationData)  -> float | dict:
+    logger = logging.getLogger("rag_evaluator.attribution_score")
+    model = get_gemini_client()
+    
+    total_completeness = 0.0
+    count = 0
+    detailed_results = []
+    detailed = get_config().return_detailed_results
+    
+    cases = [result for result in evaluation_data.test_case_results if result.generated_answer]
+    
+    for result, analysis in zip(cases, _combined_answer_analysis(cases, model)):
         try:
-            response = model.generate_for_metrics(prompt)
-            score = float(re.search(r'(\d+(?:\.\d+)?)', response).group(1))
-            completeness = score / 10.0
+            completeness = analysis.result()[0]
         except Exception as e:
+            # Unparseable cases are left out of the average rather than counted as 0
             logger.warning(f"Failed to parse answer completeness score: {e}")
+            continue
         
         total_completeness += completeness
         count += 1
 
-        if get_config().return_detailed_results:
+        if detailed:
             detailed_results.append({
                 "query": result.query,
                 "generated_answer": result.generated_answer,
@@ -489,7 +741,7 @@ Score:"""
     
     overall_score = total_completeness / count if count > 0 else 0.0
 
-    if get_config().return_detailed_results:
+    if detailed:
         return {
             "score": overall_score,
             "individual_scores": detailed_results
@@ -505,6 +757,14 @@ def self_consistency_score(evaluation_data: EvaluationData)  -> float | dict:
     total_consistency = 0.0
     count = 0
     detailed_results = []
+    detailed = get_config().return_detailed_results
+    
+    # Short answers are treated as consistent without asking the model
+    cases = [
+        result for result in evaluation_data.test_case_results
+        if result.generated_answer and len(result.generated_answer.split()) >= 20
+    ]
+    analyses = iter(_combined_answer_analysis(cases, model))
     
     for result in evaluation_data.test_case_results:
         if not result.generated_answer:
@@ -515,32 +775,16 @@ def self_consistency_score(evaluation_data: EvaluationData)  -> float | dict:
             count += 1
             continue
         
-        prompt = f"""Check for internal consistency in this answer.
-
-Answer: {result.generated_answer}
-
-Look for:
-1. Contradictory statements
-2. Logical inconsistencies
-3. Conflicting facts or claims
-4. Unclear or ambiguous statements
-
-Rate consistency (0-10), where 10 is perfectly consistent.
-Output only the numeric score.
-
-Score:"""
-        
         try:
-            response = model.generate_for_metrics(prompt)
-            score = float(re.search(r'(\d+(?:\.\d+)?)', response).group(1))
-            consistency = score / 10.0
+            consistency = next(analyses).result()[1]
         except Exception as e:
             logger.warning(f"Failed to parse answer self consistency score: {e}")
+            continue
         
         total_consistency += consistency
         count += 1
 
-        if get_config().return_detailed_results:
+        if detailed:
             detailed_results.append({
                 "query": result.query,
                 "generated_answer": result.generated_answer,
@@ -550,7 +794,7 @@ Score:"""
 
     overall_score = total_consistency / count if count > 0 else 0.0
 
-    if get_config().return_detailed_results:
+    if detailed:
         return {
             "score": overall_score,
             "individual_scores": detailed_results
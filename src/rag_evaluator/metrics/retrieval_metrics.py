@@ -1,48 +1,76 @@
+import itertools
 import json
 import logging
 import re
-from typing import List, Set
+import threading
+from functools import lru_cache
+from typing import List, Optional, Set, Tuple
 import numpy as np
-from sklearn.metrics.pairwise import cosine_similarity
 import spacy
 
 from rag_evaluator.clients.gemini_client import GeminiClient, get_gemini_client
 from rag_evaluator.clients.voyage_client import embed_texts
 from rag_evaluator.config import get_config
 
-from ..framework.evaluation_data import EvaluationData
+from ..framework.evaluation_data import EvaluationData, document_text
 
 
+# JSON array of 0/1 flags returned by the context_precision prompt
+_INDEX_ARRAY_RE = re.compile(r'\[[\d,\s]+\]')
+
+_LEADING_ARTICLE_RE = re.compile(r'^(?:the|a|an) ')
+
+# context_entities_recall only reads doc.ents, so everything but the transformer and NER is left out
+_NLP_EXCLUDE = ["tagger", "parser", "attribute_ruler", "lemmatizer"]
+
 _nlp_model = None
+_nlp_model_lock = threading.Lock()
 
 
 def _get_nlp_model():
     global _nlp_model
     if _nlp_model is None:
+        with _nlp_model_lock:
+            if _nlp_model is None:
+                _nlp_model = _load_nlp_model()
+    return _nlp_model
+
+
+def _load_nlp_model():
+    try:
+        spacy.prefer_gpu()
+    except Exception:
+        pass
+    try:
+        return spacy.load("en_core_web_trf", exclude=_NLP_EXCLUDE)
+    except OSError:
+        import subprocess
         try:
-            spacy.prefer_gpu()
+            subprocess.run(["python", "-m", "spacy", "download", "en_core_web_trf"], check=True)
+            return spacy.load("en_core_web_trf", exclude=_NLP_EXCLUDE)
         except Exception:
-            pass
-        try:
-            _nlp_model = spacy.load("en_core_web_trf")
-        except OSError:
-            import subprocess
             try:
-                subprocess.run(["python", "-m", "spacy", "download", "en_core_web_trf"], check=True)
-                _nlp_model = spacy.load("en_core_web_trf")
-            except Exception:
-                try:
-                    _nlp_model = spacy.load("en_core_web_sm")
-                except OSError:
-                    subprocess.run(["python", "-m", "spacy", "download", "en_core_web_sm"], check=False)
-                    _nlp_model = spacy.load("en_core_web_sm")
-    return _nlp_model
+                return spacy.load("en_core_web_sm", exclude=_NLP_EXCLUDE)
+            except OSError:
+                subprocess.run(["python", "-m", "spacy", "download", "en_core_web_sm"], check=False)
+                return spacy.load("en_core_web_sm", exclude=_NLP_EXCLUDE)
+
+
+def preload_nlp_model() -> None:
+    """Load the spaCy model context_entities_recall uses, so its first call does not pay the load."""
+    _get_nlp_model()
 
 
-def _extract_entities(text: str) -> Set[str]:
-    nlp = _get_nlp_model()
-    doc = nlp(text)
-    return {ent.text.lower().strip() for ent in doc.ents if ent.text.strip()}
+def _extract_entities(texts: List[str], batch_size: int = 32) -> List[Set[str]]:
+    """Entities of each text, running every distinct text through spaCy in batches."""
+    if not texts:
+        return []
+    unique_texts = list(dict.fromkeys(texts))
+    entities = {
+        text: {ent.text.lower().strip() for ent in doc.ents if ent.text.strip()}
+        for text, doc in zip(unique_texts, _get_nlp_model().pipe(unique_texts, batch_size=batch_size))
+    }
+    return [entities[text] for text in texts]
 
 
 def context_precision(evaluation_data: EvaluationData) -> float | dict:
@@ -52,16 +80,20 @@ def context_precision(evaluation_data: EvaluationData) -> float | dict:
     total_precision = 0.0
     count = 0
     detailed_results = []
+    detailed = get_config().return_detailed_results
     
+    cases = []
+    prompts = []
     for result in evaluation_data.test_case_results:
         if not result.retrieved_documents or not result.query:
             continue
         
-        contexts = _extract_document_texts(result.retrieved_documents)[:5]
+        contexts_text = _format_contexts(result.retrieved_documents, 200, max_docs=5, label=None)
         
-        contexts_text = "\n\n".join([f"{i+1}. {ctx[:200]}..." for i, ctx in enumerate(contexts)])
-        
-        prompt = f"""Evaluate the relevance of each retrieved context to the query.
+        cases.append((result, bool(contexts_text)))
+        if not contexts_text:
+            continue
+        prompts.append(f"""Evaluate the relevance of each retrieved context to the query.
 
 Query: {result.query}
 
@@ -74,32 +106,35 @@ Respond with ONLY a JSON array of 1 (relevant) or 0 (not relevant), one for each
 
 Example response: [1, 0, 1, 0, 1]
 
-Response:"""
-        
-        try:
-            response = model.generate_for_metrics(prompt)
-            
-            match = re.search(r'\[[\d,\s]+\]', response)
-            relevance = json.loads(match.group())
-            
-            precision_sum = 0.0
-            relevant_count = 0
-            
-            for k, is_relevant in enumerate(relevance, 1):
-                if is_relevant:
-                    relevant_count += 1
-                    precision_sum += relevant_count / k
-            
-            precision = precision_sum / sum(relevance) if sum(relevance) > 0 else 0.0
-            
-        except Exception as e:
-            logger.warning(f"LLM evaluation failed: {e}")
+Response:""")
+    
+    responses = iter(model.generate_batch_for_metrics(prompts))
+    for result, has_contexts in cases:
+        # Blank contexts were not sent to Gemini; none of them can be relevant
+        if not has_contexts:
             precision = 0.0
-        
+        else:
+            try:
+                response = next(responses)
+                if isinstance(response, Exception):
+                    raise response
+                
+                match = _INDEX_ARRAY_RE.search(response)
+                relevance = np.asarray(json.loads(match.group()), dtype=np.float64)
+                hits = relevance != 0
+                
+                relevance_total = relevance.sum()
+                ranks = np.arange(1, len(relevance) + 1)
+                precision = float((np.cumsum(hits) / ranks)[hits].sum() / relevance_total) if relevance_total > 0 else 0.0
+                
+            except Exception as e:
+                logger.warning(f"LLM evaluation failed: {e}")
+                precision = 0.0
+            
         total_precision += precision
         count += 1
 
-        if get_config().return_detailed_results:
+        if detailed:
             detailed_results.append({
                 "query": result.query,
                 "generated_answer": result.generated_answer,
@@ -109,7 +144,7 @@ Response:"""
     
     overall_score = total_precision / count if count > 0 else 0.0
     
-    if get_config().return_detailed_results:
+    if detailed:
         return {
             "score": overall_score,
             "individual_scores": detailed_results
@@ -119,10 +154,20 @@ Response:"""
 
 
 def _extract_document_texts(documents) -> List[str]:
-    return [
-        doc.get_content() if hasattr(doc, "get_content") else str(doc)
-        for doc in documents
-    ]
+    return [document_text(doc) for doc in documents]
+
+
+def _format_contexts(documents, limit: int, max_docs: Optional[int] = None, label: Optional[str] = "Context") -> str:
+    """Numbered "<label> i: <text>..." blocks of the first max_docs documents, each cut to limit characters.
+    
+    Only the kept prefix of each document is materialized. Empty when none of the prefixes has any text.
+    """
+    snippets = [document_text(doc)[:limit] for doc in itertools.islice(documents, max_docs)]
+    if not any(snippet.strip() for snippet in snippets):
+        return ""
+    if label is None:
+        return "\n\n".join(f"{i+1}. {snippet}..." for i, snippet in enumerate(snippets))
+    return "\n\n".join(f"{label} {i+1}: {snippet}..." for i, snippet in enumerate(snippets))
 
 
 def context_recall(evaluation_data: EvaluationData)  -> float | dict:
@@ -132,31 +177,29 @@ def context_recall(evaluation_data: EvaluationData)  -> float | dict:
     total_recall = 0.0
     count = 0
     detailed_results = []
+    detailed = get_config().return_detailed_results
     
+    items = []
     for result in evaluation_data.test_case_results:
-        ground_truth = result.ground_truth
-        if not ground_truth or not result.retrieved_documents:
-            total_recall += 0.0
-            count += 1
+        if not result.ground_truth or not result.retrieved_documents:
             continue
         
-        try:
-            retrieved_texts = _extract_document_texts(result.retrieved_documents)
-            contexts_text = "\n\n".join([f"Context {i+1}: {text[:300]}..." 
-                                       for i, text in enumerate(retrieved_texts)])
-            
-            recall_score = _compute_claim_attribution(ground_truth, contexts_text, model, logger)
-            
-            total_recall += recall_score
-            count += 1
-            
-        except Exception as e:
-            logger.error(f"Failed to compute recall for query '{result.query}': {e}")
+        contexts_text = _format_contexts(result.retrieved_documents, 300)
+        items.append((result.ground_truth, contexts_text))
+    
+    recall_scores = iter(_compute_claim_attributions(items, model, logger))
+    
+    for result in evaluation_data.test_case_results:
+        if not result.ground_truth or not result.retrieved_documents:
             total_recall += 0.0
-            recall_score = 0.0
             count += 1
+            continue
+        
+        recall_score = next(recall_scores)
+        total_recall += recall_score
+        count += 1
 
-        if get_config().return_detailed_results:
+        if detailed:
             detailed_results.append({
                 "query": result.query,
                 "generated_answer": result.generated_answer,
@@ -166,7 +209,7 @@ def context_recall(evaluation_data: EvaluationData)  -> float | dict:
     
     overall_score = total_recall / count if count > 0 else 0.0
     
-    if get_config().return_detailed_results:
+    if detailed:
         return {
             "score": overall_score,
             "individual_scores": detailed_results
@@ -175,60 +218,74 @@ def context_recall(evaluation_data: EvaluationData)  -> float | dict:
     return overall_score
 
 
-def _compute_claim_attribution(reference: str, contexts_text: str, model: GeminiClient, logger: logging.Logger) -> float:
-    claims_prompt = f"""Extract all factual claims from this reference answer.
+def _claim_attribution_prompt(reference: str, contexts_text: str) -> str:
+    return f"""Extract all factual claims from this reference answer.
 Each claim should be a single, verifiable statement.
+Then, for each claim, determine if it can be supported/attributed to the provided contexts.
 
 Reference Answer: {reference}
 
-List each claim on a separate line starting with a number. Output only list of the claims, nothing else.
+Contexts:
+{contexts_text}
 
-Example claims:
-1. [First claim]
-2. [Second claim]
-3. [Third claim]
+For each claim, give 1 (can be attributed) or 0 (cannot be attributed), in the same order as the claims.
 
-Claims:"""
-    
-    try:
-        claims_response = model.generate_for_metrics(claims_prompt)
-        
-        claims = []
-        for line in claims_response.split('\n'):
-            if line.strip() and any(line.strip().startswith(str(i)) for i in range(1, 21)):
-                claim = re.sub(r'^\d+\.\s*', '', line.strip())
-                if claim:
-                    claims.append(claim)
-        
-        if not claims:
-            return 0.0
-        
-        attribution_prompt = f"""For each claim below, determine if it can be supported/attributed to the provided contexts.
+Respond with JSON only, in the form:
+{{"claims": ["[First claim]", "[Second claim]"], "labels": [1, 0]}}"""
 
-Contexts:
-{contexts_text}
 
-Claims to check:
-{chr(10).join([f"{i+1}. {claim}" for i, claim in enumerate(claims)])}
+def _parse_labelled_items(response: str, items_key: str) -> Tuple[List[str], List[int]]:
+    try:
+        parsed = json.loads(response)
+    except json.JSONDecodeError:
+        parsed = json.loads(response[response.find('{'):response.rfind('}') + 1])
+    
+    return list(parsed.get(items_key, [])), [int(label) for label in parsed.get("labels", [])]
 
-For each claim, respond with 1 (can be attributed) or 0 (cannot be attributed).
-Respond with only a JSON array: [1, 0, 1, 0, ...]
 
-Response:"""
-        
-        attribution_response = model.generate_for_metrics(attribution_prompt)
-        
-        match = re.search(r'\[[\d,\s]+\]', attribution_response)
-        if match:
-            attributions = json.loads(match.group())
-            if len(attributions) == len(claims):
-                return sum(attributions) / len(claims)
+def _compute_labelled_shares(prompts: List[str], items_key: str, model: GeminiClient, logger: logging.Logger,
+                             fallback_divisor: float, failure_message: str) -> List[float]:
+    """Share of the `items_key` items each prompt's response labels 1, with every prompt sent concurrently.
+    
+    A response without a label per item scores len(items) / fallback_divisor.
+    """
+    scores = []
+    for response in model.generate_batch_for_claims(prompts):
+        try:
+            if isinstance(response, Exception):
+                raise response
+            
+            items, labels = _parse_labelled_items(response, items_key)
+            if not items:
+                score = 0.0
+            elif len(labels) == len(items):
+                score = sum(labels) / len(items)
+            else:
+                score = len(items) / fallback_divisor
         
-        return len(claims) / 3.0
+        except Exception as e:
+            logger.warning(f"{failure_message}: {e}")
+            score = 0.0
         
-    except Exception as e:
-        logger.warning(f"Claim attribution failed: {e}")
-        return 0.0
+        scores.append(score)
+    
+    return scores
+
+
+def _compute_claim_attributions(items: List[Tuple[str, str]], model: GeminiClient, logger: logging.Logger) -> List[float]:
+    """Share of each reference's claims attributable to its contexts, for (reference, contexts_text) items.
+    
+    Claims are extracted and checked in one prompt per item, with every prompt sent concurrently.
+    Items with a blank reference or no context text score 0.0 without a Gemini call.
+    """
+    scores = [0.0] * len(items)
+    active = [index for index, (reference, contexts_text) in enumerate(items) if reference.strip() and contexts_text.strip()]
+    prompts = [_claim_attribution_prompt(*items[index]) for index in active]
+    attributions = _compute_labelled_shares(prompts, "claims", model, logger, 3.0, "Claim attribution failed")
+    for index, score in zip(active, attributions):
+        scores[index] = score
+    
+    return scores
 
 
 def context_relevance(evaluation_data: EvaluationData)  -> float | dict:
@@ -238,30 +295,29 @@ def context_relevance(evaluation_data: EvaluationData)  -> float | dict:
     total_relevance = 0.0
     count = 0
     detailed_results = []
+    detailed = get_config().return_detailed_results
     
+    items = []
     for result in evaluation_data.test_case_results:
         if not result.retrieved_documents or not result.query:
-            total_relevance += 0.0
-            count += 1
             continue
         
-        try:
-            retrieved_texts = _extract_document_texts(result.retrieved_documents)
-            contexts_text = "\n\n".join([f"Context {i+1}: {text[:400]}..." 
-                                       for i, text in enumerate(retrieved_texts[:5])])
-            
-            relevance_score = _compute_statement_relevance(result.query, contexts_text, model, logger)
-            
-            total_relevance += relevance_score
-            count += 1
-            
-        except Exception as e:
-            logger.error(f"Failed to compute context relevance for query '{result.query}': {e}")
+        contexts_text = _format_contexts(result.retrieved_documents, 400, max_docs=5)
+        items.append((result.query, contexts_text))
+    
+    relevance_scores = iter(_compute_statement_relevances(items, model, logger))
+    
+    for result in evaluation_data.test_case_results:
+        if not result.retrieved_documents or not result.query:
             total_relevance += 0.0
-            relevance_score = 0.0
             count += 1
+            continue
+        
+        relevance_score = next(relevance_scores)
+        total_relevance += relevance_score
+        count += 1
 
-        if get_config().return_detailed_results:
+        if detailed:
             detailed_results.append({
                 "query": result.query,
                 "generated_answer": result.generated_answer,
@@ -271,7 +327,7 @@ def context_relevance(evaluation_data: EvaluationData)  -> float | dict:
 
     overall_score = total_relevance / count if count > 0 else 0.0
     
-    if get_config().return_detailed_results:
+    if detailed:
         return {
             "score": overall_score,
             "individual_scores": detailed_results
@@ -280,68 +336,48 @@ def context_relevance(evaluation_data: EvaluationData)  -> float | dict:
     return overall_score
 
 
-def _compute_statement_relevance(query: str, contexts_text: str, model, logger: logging.Logger)  -> float | dict:
-    extraction_prompt = f"""Extract all meaningful statements from the provided contexts.
+def _statement_relevance_prompt(query: str, contexts_text: str) -> str:
+    return f"""Extract all meaningful statements from the provided contexts.
 Each statement should be a single, complete fact or piece of information.
+Then, for each statement, determine if it is relevant to answering this query.
+
+Query: {query}
 
 Contexts:
 {contexts_text}
 
-List each statement on a separate line starting with a number. Output only list of the statements, nothing else.
+For each statement, give 1 (relevant) or 0 (not relevant), in the same order as the statements.
 
-Example statements:
-1. [First statement]
-2. [Second statement]
-3. [Third statement]
+Respond with JSON only, in the form:
+{{"statements": ["[First statement]", "[Second statement]"], "labels": [1, 0]}}"""
 
-Statements:"""
-    
-    try:
-        extraction_response = model.generate_for_metrics(extraction_prompt)
-        
-        statements = []
-        for line in extraction_response.split('\n'):
-            if line.strip() and any(line.strip().startswith(str(i)) for i in range(1, 21)):
-                statement = re.sub(r'^\d+\.\s*', '', line.strip())
-                if statement:
-                    statements.append(statement)
-        
-        if not statements:
-            return 0.0
-        
-        statements_text = "\n".join([f"{i+1}. {stmt}" for i, stmt in enumerate(statements)])
-        
-        classification_prompt = f"""For each statement below, determine if it is relevant to answering this query.
-
-Query: {query}
-
-Statements:
-{statements_text}
 
-For each statement, respond with 1 (relevant) or 0 (not relevant).
-Respond with only a JSON array: [1, 0, 1, 0, ...]
-
-Response:"""
-        
-        classification_response = model.generate_for_metrics(classification_prompt)
-        
-        match = re.search(r'\[[\d,\s]+\]', classification_response)
-        if match:
-            relevance_scores = json.loads(match.group())
-            if len(relevance_scores) == len(statements):
-                return sum(relevance_scores) / len(relevance_scores)
-        
-        return len(statements) / 5.0
-        
-    except Exception as e:
-        logger.warning(f"Statement relevance computation failed: {e}")
-        return 0.0
+def _compute_statement_relevances(items: List[Tuple[str, str]], model: GeminiClient, logger: logging.Logger) -> List[float]:
+    """Share of statements in each item's contexts relevant to its query, for (query, contexts_text) items.
+    
+    Statements are extracted and classified in one prompt per item, with every prompt sent concurrently.
+    Items with a blank query or no context text score 0.0 without a Gemini call.
+    """
+    scores = [0.0] * len(items)
+    active = [index for index, (query, contexts_text) in enumerate(items) if query.strip() and contexts_text.strip()]
+    prompts = [_statement_relevance_prompt(*items[index]) for index in active]
+    relevances = _compute_labelled_shares(prompts, "statements", model, logger, 5.0, "Statement relevance computation failed")
+    for index, score in zip(active, relevances):
+        scores[index] = score
+    
+    return scores
 
 
 def context_entities_recall(evaluation_data: EvaluationData)  -> float | dict:    
     total_recall = 0.0
     count = 0
     detailed_results = []
+    detailed = get_config().return_detailed_results
+    
+    cases = [result for result in evaluation_data.test_case_results if result.entities and result.retrieved_documents]
+    retrieved_entities = iter(_extract_entities([
+        " ".join(_extract_document_texts(result.retrieved_documents)) for result in cases
+    ]))
     
     for result in evaluation_data.test_case_results:
         expected_entities = result.entities
@@ -353,10 +389,7 @@ def context_entities_recall(evaluation_data: EvaluationData)  -> float | dict:
             count += 1
             continue
         
-        retrieved_texts = _extract_document_texts(result.retrieved_documents)
-        combined_text = " ".join(retrieved_texts)
-        
-        retrieved_entities_raw = _extract_entities(combined_text)
+        retrieved_entities_raw = next(retrieved_entities)
         
         expected_entities_normalized = {
             _normalize_entity(entity) for entity in expected_entities
@@ -371,7 +404,7 @@ def context_entities_recall(evaluation_data: EvaluationData)  -> float | dict:
         total_recall += recall
         count += 1
 
-        if get_config().return_detailed_results:
+        if detailed:
             detailed_results.append({
                 "query": result.query,
                 "generated_answer": result.generated_answer,
@@ -381,7 +414,7 @@ def context_entities_recall(evaluation_data: EvaluationData)  -> float | dict:
     
     overall_score = total_recall / count if count > 0 else 0.0
     
-    if get_config().return_detailed_results:
+    if detailed:
         return {
             "score": overall_score,
             "individual_scores": detailed_results
@@ -390,14 +423,9 @@ def context_entities_recall(evaluation_data: EvaluationData)  -> float | dict:
     return overall_score
 
 
+@lru_cache(maxsize=100_000)
 def _normalize_entity(entity: str) -> str:
-    normalized = entity.lower().strip()
-    
-    articles = ['the ', 'a ', 'an ']
-    for article in articles:
-        if normalized.startswith(article):
-            normalized = normalized[len(article):]
-            break
+    normalized = _LEADING_ARTICLE_RE.sub('', entity.lower().strip(), count=1)
     
     normalized = ' '.join(normalized.split())
     normalized = normalized.rstrip("’'s")
@@ -406,6 +434,13 @@ def _normalize_entity(entity: str) -> str:
     return normalized
 
 
+def _embed_unit(texts: List[str]) -> np.ndarray:
+    """Embeddings of texts, L2-normalized so cosine similarity is a plain dot product."""
+    embeddings = np.asarray(embed_texts(texts), dtype=np.float32)
+    norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+    return embeddings / np.where(norms > 0, norms, 1.0)
+
+
 def semantic_diversity(
     evaluation_data: EvaluationData,
     lambda_param: float = 0.5,
@@ -416,45 +451,52 @@ def semantic_diversity(
     total_mmr_score = 0.0
     count = 0
     detailed_results = []
+    detailed = get_config().return_detailed_results
     
+    # Every case's query and documents are embedded in one call, then sliced back per case
+    cases = []
+    all_texts = []
     for result in evaluation_data.test_case_results:
         if not result.retrieved_documents or len(result.retrieved_documents) < 2:
             continue
         
+        retrieved_texts = _extract_document_texts(result.retrieved_documents[:top_k])
+        cases.append((result, len(all_texts), len(all_texts) + 1 + len(retrieved_texts)))
+        all_texts.append(result.query)
+        all_texts.extend(retrieved_texts)
+    
+    try:
+        all_embeddings = _embed_unit(all_texts) if all_texts else None
+        case_embeddings = [all_embeddings[start:end] for _, start, end in cases]
+    except Exception as e:
+        # Re-embed case by case so one failing text only drops its own case
+        logger.warning(f"Batched embedding for semantic diversity failed, embedding per case: {e}")
+        case_embeddings = []
+        for result, start, end in cases:
+            try:
+                case_embeddings.append(_embed_unit(all_texts[start:end]))
+            except Exception as case_error:
+                logger.warning(f"Failed to embed texts for query '{result.query[:50]}...': {case_error}")
+                case_embeddings.append(None)
+    
+    for (result, _, _), embeddings in zip(cases, case_embeddings):
         query = result.query
-        retrieved_texts = [
-            doc.get_content() if hasattr(doc, "get_content") else str(doc)
-            for doc in result.retrieved_documents[:top_k]
-        ]
+        if embeddings is None:
+            continue
         
         try:
-            all_texts = [query] + retrieved_texts
-            embeddings = embed_texts(all_texts)
-            
-            query_embedding = embeddings[0:1]
+            query_embedding = embeddings[0]
             doc_embeddings = embeddings[1:]
             
-            mmr_scores = []
-            selected_docs = []
+            # Documents are taken in rank order, so document i is penalized by its closest predecessor j < i
+            query_sims = doc_embeddings @ query_embedding
+            doc_sims = doc_embeddings @ doc_embeddings.T
+            predecessors = np.tri(len(doc_embeddings), k=-1, dtype=bool)
+            max_sims_to_selected = np.where(predecessors, doc_sims, -np.inf).max(axis=1)
+            max_sims_to_selected[0] = 0.0
             
-            for i, doc_emb in enumerate(doc_embeddings):
-                query_sim = cosine_similarity(
-                    doc_emb.reshape(1, -1), query_embedding
-                )[0][0]
-                
-                if selected_docs:
-                    selected_embeddings = np.array([doc_embeddings[j] for j in selected_docs])
-                    max_sim_to_selected = np.max(cosine_similarity(
-                        doc_emb.reshape(1, -1), selected_embeddings
-                    ))
-                else:
-                    max_sim_to_selected = 0.0
-                
-                mmr_score = (lambda_param * query_sim - 
-                           (1 - lambda_param) * max_sim_to_selected)
-                
-                mmr_scores.append(mmr_score)
-                selected_docs.append(i)
+            mmr_scores = (lambda_param * query_sims - 
+                          (1 - lambda_param) * max_sims_to_selected)
             
             avg_mmr = np.mean(mmr_scores)
             normalized_mmr = (avg_mmr + 1) / 2
@@ -462,7 +504,7 @@ def semantic_diversity(
             total_mmr_score += normalized_mmr
             count += 1
 
-            if get_config().return_detailed_results:
+            if detailed:
                 detailed_results.append({
                     "query": result.query,
                     "generated_answer": result.generated_answer,
@@ -477,7 +519,7 @@ def semantic_diversity(
 
     overall_score = total_mmr_score / count if count > 0 else 0.0
     
-    if get_config().return_detailed_results:
+    if detailed:
         return {
             "score": overall_score,
             "individual_scores": detailed_results
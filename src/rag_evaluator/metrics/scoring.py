@@ -0,0 +1,12 @@
+import re
+from typing import Optional
+
+
+# First number in a free-text 0-10 rating
+SCORE_RE = re.compile(r'\d+(?:\.\d+)?')
+
+
+def parse_score(response: str) -> Optional[float]:
+    """The first number in a 0-10 score response, scaled to 0-1, or None if there is none."""
+    match = SCORE_RE.search(response)
+    return float(match.group()) / 10.0 if match else None
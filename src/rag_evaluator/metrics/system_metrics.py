@@ -1,12 +1,20 @@
+import json
 import re
 import logging
-import numpy as np
+from typing import List, Optional
 
 from rag_evaluator.config import get_config
 from rag_evaluator.constants import QuestionType
 
-from ..framework.evaluation_data import EvaluationData
+from ..framework.evaluation_data import EvaluationData, document_text
 from ..clients.gemini_client import get_gemini_client
+from .scoring import parse_score
+
+
+# Test cases rated together in one Gemini prompt by the scalar-scoring metrics
+_ROWS_PER_PROMPT = 10
+
+_SCORE_ARRAY_RE = re.compile(r'\[[\d.,\s]+\]')
 
 
 class SystemMetrics:
@@ -17,43 +25,127 @@ class SystemMetrics:
     def _evaluate_with_llm(self, prompt: str, default_score: float = 0.5) -> float:
         try:
             response = self.model.generate_for_metrics(prompt)
-            score = float(re.search(r'(\d+(?:\.\d+)?)', response).group(1))
-            return min(max(score / 10.0, 0.0), 1.0)
+            score = parse_score(response)
+            if score is None:
+                raise ValueError(f"no score in response {response[:100]!r}")
+            return min(max(score, 0.0), 1.0)
         except Exception as e:
             self.logger.warning(f"LLM evaluation failed: {e}")
             return default_score
+    
+    def _evaluate_batch_with_llm(self, prompts: List[str], default_score: float = 0.5) -> List[float]:
+        """Like _evaluate_with_llm for several prompts, sent to Gemini concurrently."""
+        scores = []
+        for response in self.model.generate_batch_for_metrics(prompts):
+            try:
+                if isinstance(response, Exception):
+                    raise response
+                score = parse_score(response)
+                if score is None:
+                    raise ValueError(f"no score in response {response[:100]!r}")
+                scores.append(min(max(score, 0.0), 1.0))
+            except Exception as e:
+                self.logger.warning(f"LLM evaluation failed: {e}")
+                scores.append(default_score)
+        return scores
+    
+    @staticmethod
+    def _single_row_prompt(title: str, criteria: str, row: str) -> str:
+        return f"""{title}
+
+{row}
+
+{criteria}
+
+Output only the numeric score (0-10).
+
+Score (0-10):"""
+    
+    @staticmethod
+    def _multi_row_prompt(title: str, criteria: str, rows: List[str]) -> str:
+        items = "\n\n".join(f"Item {i}:\n{row}" for i, row in enumerate(rows, 1))
+        return f"""{title}
+
+{criteria}
+
+Rate each of the following {len(rows)} items independently.
+
+{items}
+
+Respond with only a JSON array of {len(rows)} numbers (0-10), one per item in order.
+
+Scores:"""
+    
+    @staticmethod
+    def _parse_score_array(response: str, count: int) -> Optional[List[float]]:
+        match = _SCORE_ARRAY_RE.search(response)
+        if not match:
+            return None
+        scores = json.loads(match.group())
+        if len(scores) != count:
+            return None
+        return [min(max(float(score) / 10.0, 0.0), 1.0) for score in scores]
+    
+    def _evaluate_rows_with_llm(self, title: str, criteria: str, rows: List[str],
+                                batch_size: int = _ROWS_PER_PROMPT, default_score: float = 0.5) -> List[float]:
+        """Score rows `batch_size` per prompt; rows of a chunk whose reply can't be parsed are retried one per prompt."""
+        chunks = [rows[i:i + batch_size] for i in range(0, len(rows), batch_size)]
+        prompts = [self._multi_row_prompt(title, criteria, chunk) for chunk in chunks]
+        
+        scores = []
+        retry = []
+        for chunk, response in zip(chunks, self.model.generate_batch_for_metrics(prompts)):
+            try:
+                if isinstance(response, Exception):
+                    raise response
+                parsed = self._parse_score_array(response, len(chunk))
+                if parsed is None:
+                    raise ValueError(f"expected {len(chunk)} scores, got {response[:100]!r}")
+            except Exception as e:
+                self.logger.warning(f"Batched LLM evaluation failed, retrying {len(chunk)} rows one by one: {e}")
+                retry.extend(range(len(scores), len(scores) + len(chunk)))
+                parsed = [default_score] * len(chunk)
+            scores.extend(parsed)
+        
+        if retry:
+            prompts = [self._single_row_prompt(title, criteria, rows[index]) for index in retry]
+            for index, score in zip(retry, self._evaluate_batch_with_llm(prompts, default_score)):
+                scores[index] = score
+        
+        return scores
 
 
 def answer_correctness(evaluation_data: EvaluationData)  -> float | dict:
     evaluator = SystemMetrics()
     
-    total_scores = []
+    total_score = 0.0
+    count = 0
     detailed_results = []
+    detailed = get_config().return_detailed_results
 
+    cases = []
+    rows = []
     for result in evaluation_data.test_case_results:
         ground_truth = result.ground_truth
         if not ground_truth or not result.generated_answer:
             continue
         
-        prompt = f"""Rate answer correctness against ground truth (0-10).
-
-Query: {result.query}
+        cases.append(result)
+        rows.append(f"""Query: {result.query}
 Ground Truth: {ground_truth}
-Generated Answer: {result.generated_answer}
-
-Consider:
+Generated Answer: {result.generated_answer}""")
+    
+    title = "Rate answer correctness against ground truth (0-10)."
+    criteria = """Consider:
 - Factual accuracy
 - Completeness of important points
-- No contradictions
-
-Output only the numeric score (0-10).
-
-Score (0-10):"""
-        
-        score = evaluator._evaluate_with_llm(prompt)
-        total_scores.append(score)
+- No contradictions"""
+    
+    for result, score in zip(cases, evaluator._evaluate_rows_with_llm(title, criteria, rows)):
+        total_score += score
+        count += 1
 
-        if get_config().return_detailed_results:
+        if detailed:
             detailed_results.append({
                 "query": result.query,
                 "generated_answer": result.generated_answer,
@@ -61,9 +153,9 @@ Score (0-10):"""
                 "score": score,
             })
     
-    overall_score = np.mean(total_scores) if total_scores else 0.0
+    overall_score = total_score / count if count > 0 else 0.0
     
-    if get_config().return_detailed_results:
+    if detailed:
         return {
             "score": overall_score,
             "individual_scores": detailed_results
@@ -74,33 +166,35 @@ Score (0-10):"""
 
 def multi_hop_reasoning_score(evaluation_data: EvaluationData) -> float | dict:
     evaluator = SystemMetrics()
-    total_scores = []
+    total_score = 0.0
+    count = 0
     detailed_results = []
+    detailed = get_config().return_detailed_results
 
+    cases = []
+    rows = []
     for result in evaluation_data.test_case_results:
         if result.question_type != QuestionType.COMPLEX:
             continue
         if not result.generated_answer or len(result.retrieved_documents) < 2:
             continue
 
-        prompt = f"""Rate multi-hop reasoning quality (0-10).
-
-Query: {result.query}
+        cases.append(result)
+        rows.append(f"""Query: {result.query}
 Answer: {result.generated_answer}
-Documents Used: {len(result.retrieved_documents)}
+Documents Used: {len(result.retrieved_documents)}""")
 
-Rate how well the answer:
+    title = "Rate multi-hop reasoning quality (0-10)."
+    criteria = """Rate how well the answer:
 1. Connects information across multiple documents (cross-references sources).
 2. Presents a clear chain of reasoning.
-3. Synthesizes information from the sources effectively.
-
-Output only the numeric score (0-10).
+3. Synthesizes information from the sources effectively."""
 
-Score (0-10):"""
-        score = evaluator._evaluate_with_llm(prompt)
-        total_scores.append(score)
+    for result, score in zip(cases, evaluator._evaluate_rows_with_llm(title, criteria, rows)):
+        total_score += score
+        count += 1
 
-        if get_config().return_detailed_results:
+        if detailed:
             detailed_results.append({
                 "query": result.query,
                 "generated_answer": result.generated_answer,
@@ -108,12 +202,12 @@ Score (0-10):"""
                 "score": score,
             })
 
-    if not total_scores:
+    if count == 0:
         return None
 
-    overall_score = np.mean(total_scores) if total_scores else 0.0
+    overall_score = total_score / count if count > 0 else 0.0
 
-    if get_config().return_detailed_results:
+    if detailed:
         return {
             "score": overall_score,
             "individual_scores": detailed_results
@@ -124,37 +218,41 @@ Score (0-10):"""
 def context_utilization_rate(evaluation_data: EvaluationData)  -> float | dict:
     evaluator = SystemMetrics()
     
-    total_scores = []
+    total_score = 0.0
+    count = 0
     detailed_results = []
+    detailed = get_config().return_detailed_results
 
+    max_chars = get_config().context_utilization_max_chars or None
+    
+    cases = []
+    rows = []
     for result in evaluation_data.test_case_results:
         if not result.retrieved_documents or not result.generated_answer:
             continue
         
-        contexts = [
-            doc.get_content() if hasattr(doc, "get_content") else str(doc)
-            for doc in result.retrieved_documents[:5] 
-        ]
+        contexts = "\n".join(
+            f"- {document_text(doc)[:max_chars]}"
+            for doc in result.retrieved_documents[:5]
+        )
         
-        prompt = f"""Rate context utilization effectiveness (0-10).
-
-Query: {result.query}
+        cases.append(result)
+        rows.append(f"""Query: {result.query}
 Answer: {result.generated_answer}
-Available Contexts: {contexts}
-
-Rate how well the answer:
+Available Contexts:
+{contexts}""")
+    
+    title = "Rate context utilization effectiveness (0-10)."
+    criteria = """Rate how well the answer:
 1. Uses information from the provided contexts
 2. Doesn't ignore relevant available information
-3. Synthesizes context information effectively
-
-Output only the numeric score (0-10).
-
-Score (0-10):"""
-        
-        score = evaluator._evaluate_with_llm(prompt)
-        total_scores.append(score)
+3. Synthesizes context information effectively"""
+    
+    for result, score in zip(cases, evaluator._evaluate_rows_with_llm(title, criteria, rows)):
+        total_score += score
+        count += 1
 
-        if get_config().return_detailed_results:
+        if detailed:
             detailed_results.append({
                 "query": result.query,
                 "generated_answer": result.generated_answer,
@@ -162,9 +260,9 @@ Score (0-10):"""
                 "score": score,
             })
     
-    overall_score = np.mean(total_scores) if total_scores else 0.0
+    overall_score = total_score / count if count > 0 else 0.0
 
-    if get_config().return_detailed_results:
+    if detailed:
         return {
             "score": overall_score,
             "individual_scores": detailed_results